@@ -0,0 +1,203 @@
+"""Benchmarks of the overhead of dim-checker: import time, pattern parsing, formula evaluation, input creation 
+and end-to-end checks of reference torch modules.
+
+Usage:
+    python benchmarks/run_benchmarks.py --save                 # measure and save the baseline
+    python benchmarks/run_benchmarks.py --threshold 0.25       # measure and compare to the baseline
+
+The comparison exits with status 1 if a benchmark is slower than its baseline by more than the threshold, 
+so that it can run in CI. Baselines are machine dependent, save them on the machine running the comparison.
+"""
+from typing import Callable
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from dim_checker.dim_check import DimChecker
+from dim_checker.objects import Pattern, Vector
+from dim_checker.utils import evaluate_formula
+from dim_checker.validation import validate_shapes
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+class MLP(torch.nn.Module):
+
+    def __init__(self, features: int = 16) -> None:
+        super().__init__()
+        self.layers = torch.nn.Sequential(
+            torch.nn.Linear(features, 64), torch.nn.ReLU(), torch.nn.Linear(64, 64), torch.nn.ReLU(),
+            torch.nn.Linear(64, features)
+        )
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+class Conv1dStack(torch.nn.Module):
+
+    def __init__(self, channels: int = 8) -> None:
+        super().__init__()
+        self.layers = torch.nn.Sequential(
+            torch.nn.Conv1d(channels, 32, 3, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv1d(32, 32, 3, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv1d(32, channels, 3, padding=1)
+        )
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+class Conv2dStack(torch.nn.Module):
+
+    def __init__(self, channels: int = 3) -> None:
+        super().__init__()
+        self.layers = torch.nn.Sequential(
+            torch.nn.Conv2d(channels, 16, 3, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(16, 16, 3, padding=1, stride=2), torch.nn.ReLU(),
+            torch.nn.Conv2d(16, channels, 1)
+        )
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+class AttentionBlock(torch.nn.Module):
+
+    def __init__(self, features: int = 32, heads: int = 4) -> None:
+        super().__init__()
+        self.attention = torch.nn.MultiheadAttention(features, heads, batch_first=True)
+        self.norm = torch.nn.LayerNorm(features)
+
+    def forward(self, x):
+        return self.norm(x + self.attention(x, x, x, need_weights=False)[0])
+
+
+# reference modules with their pattern and constraints.
+MODULES = {
+    "mlp": (MLP(), "bf->bf", {"f": 16}),
+    "conv1d": (Conv1dStack(), "bcl->bcl", {"c": 8}),
+    "conv2d": (Conv2dStack(), "bchw->bc((h+1)//2)((w+1)//2)", {"c": 3}),
+    "attention": (AttentionBlock(), "blf->blf", {"f": 32}),
+}
+PATTERNS = ["bcl->bcl", "bchw, bc->b(2*c+1)((h+1)//2)w", "abcde, ab, cd->(a*b)(c+d)e, e"]
+
+
+def benchmarks() -> dict[str, Callable]:
+    """Benchmarked operations, by name.
+
+    Returns:
+        dict[str, Callable]: operations to time.
+    """
+    benches = {}
+    # fresh interpreter importing the package, the interpreter startup is included
+    for module in ["dim_checker", "dim_checker.dim_check"]:
+        benches[f"import/{module}"] = (
+            lambda module=module: subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        )
+    for i, pattern in enumerate(PATTERNS):
+        benches[f"parse/pattern{i}"] = lambda pattern=pattern: Pattern(pattern)
+    variables = {"c": 13, "h": 29, "n": 7}
+    benches["formula/affine"] = lambda: evaluate_formula("2*c+1", variables)
+    benches["formula/floordiv"] = lambda: evaluate_formula("(h+1)//2*n", variables)
+    for eval_type in ["torch", "numpy"]:
+        for eval_value in ["random", "zeros"]:
+            benches[f"vector/{eval_type}/{eval_value}"] = (
+                lambda t=eval_type, v=eval_value: Vector([17, 31, 61], v, t).eval_vector
+            )
+    rng = np.random.default_rng(0)
+    b, c = rng.integers(1, 100, (2, 10**6))
+    shapes = [np.stack([b, c], 1), c[:, None]], [np.stack([b, 2 * c + 1], 1)]
+    benches["validate_shapes/1e6"] = lambda: validate_shapes("bc,c->b(2*c+1)", *shapes)
+    for name, (module, pattern, constraints) in MODULES.items():
+        for depth in [1, 3]:
+            for max_size in [30, 100]:
+                checker = DimChecker(depth=depth, max_size=max_size)
+                benches[f"test_dims/{name}/depth{depth}/max{max_size}"] = (
+                    lambda c=checker, m=module, p=pattern, k=constraints: c.test_dims(m, p, **k)
+                )
+    return benches
+
+
+def measure(function: Callable, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Time an operation: the best time per call over several repetitions.
+
+    Args:
+        function (Callable): operation to time.
+        repeat (int, optional): number of repetitions. Defaults to 5.
+        min_time (float, optional): minimum duration of a repetition in seconds. Defaults to 0.05.
+
+    Returns:
+        float: time per call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """Find the benchmarks slower than their baseline by more than the threshold.
+
+    Args:
+        results (dict[str, float]): time per call of each benchmark.
+        baseline (dict[str, float]): baseline time per call of each benchmark.
+        threshold (float): allowed relative slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+        list[str]: descriptions of the regressions.
+    """
+    return [
+        f"{name}: {seconds * 1e6:.1f}us vs {baseline[name] * 1e6:.1f}us (+{seconds / baseline[name] - 1:.0%})"
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="path of the baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--filter", default="", help="only run the benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repetitions of each benchmark")
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    results = {}
+    for name, function in benchmarks().items():
+        if args.filter in name:
+            # the sizes drawn by the checker follow the same sequence on every run
+            random.seed(0)
+            torch.manual_seed(0)
+            results[name] = measure(function, args.repeat)
+            print(f"{name:<45} {results[name] * 1e6:>12.1f} us")
+
+    if args.save:
+        args.baseline.write_text(json.dumps({
+            "machine": platform.platform(), "python": platform.python_version(), "torch": torch.__version__,
+            "results": results,
+        }, indent=2))
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline found at {args.baseline}, run with --save first.")
+        return 0
+    regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.threshold)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+from functools import wraps
+from typing import Callable
+import inspect
+
+from dim_checker.errors.dimchecker_errors import OutputsNumberError
+from dim_checker.objects import CompiledPattern, Constraints, compile_pattern
+
+
+class ContractStats:
+    """Counters of the calls, checks and violations of runtime contracts.
+    """
+
+    def __init__(self) -> None:
+        """Initializes counters to zero.
+        """
+        self.calls = 0
+        self.checks = 0
+        self.violations = 0
+
+    def __repr__(self) -> str:
+        """Creates string representation of the counters.
+
+        Returns:
+            str: string representation of the counters.
+        """
+        return f"{self.calls} call(s), {self.checks} check(s), {self.violations} violation(s)."
+
+
+# counters of all the contracts of the process.
+stats = ContractStats()
+# global kill switch, see set_contracts_enabled.
+_enabled = True
+
+
+def set_contracts_enabled(enabled: bool) -> None:
+    """Enable or disable the checks of all the contracts. Disabled contracts only forward the calls.
+
+    Args:
+        enabled (bool): whether contracts are checked.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def check_contract(pattern: CompiledPattern, inputs: tuple, outputs, constraints: dict) -> dict:
+    """Check the shapes of the inputs and outputs of a call against a pattern. The variables are bound
+    to the actual input shapes. Input dimensions which cannot be solved (e.g. "(c*c)") leave their
+    variables unbound instead of failing.
+
+    Args:
+        pattern (CompiledPattern): pattern describing the input and output dimensions.
+        inputs (tuple): input vectors of the call.
+        outputs: output vector or tuple of output vectors of the call.
+        constraints (dict): constraints over the dimensions.
+
+    Raises:
+        OutputsNumberError: error raised if the number of outputs does not match the pattern.
+        DimensionNumberError: error raised if a shape does not have the expected number of dimensions.
+        DimensionError: error raised if a dimension does not match the pattern.
+
+    Returns:
+        dict: variables values bound by the call.
+    """
+    if not isinstance(outputs, tuple):
+        outputs = (outputs,)
+    if len(outputs) != len(pattern.out_formulas):
+        raise OutputsNumberError(len(outputs), len(pattern.out_formulas))
+
+    variables = dict(constraints)
+    for vector, in_vf in zip(inputs, pattern.in_formulas):
+        in_vf.match(vector.shape, variables, partial=True)
+    for vector, out_vf in zip(outputs, pattern.out_formulas):
+        out_vf.match(vector.shape, variables)
+    return variables
+
+
+def dim_contract(pattern: str, sample_rate: int = 1, strict: bool = True, **constraints) -> Callable:
+    """Decorator checking the shapes of the inputs and outputs of a function or forward method on live
+    calls. The inputs are the first parameters of the function, one per input vector formula, given
+    positionally or by keyword. A leading self or cls parameter is skipped so that methods can be decorated.
+
+    Args:
+        pattern (str): pattern describing the input and output dimensions, e.g. "bcl->b(2*c)l".
+        sample_rate (int, optional): check one call every sample_rate calls. Defaults to 1.
+        strict (bool, optional): raise an error on violations, otherwise violations are only
+        counted. Defaults to True.
+        constraints: constraints over the dimensions.
+
+    Returns:
+        Callable: decorator. The decorated function has a contract attribute with its own counters.
+    """
+    compiled = compile_pattern(pattern)
+    constraints = Constraints(constraints).constraints
+    nb_inputs = len(compiled.in_formulas)
+
+    def decorator(function: Callable) -> Callable:
+        contract_stats = ContractStats()
+        signature = inspect.signature(function)
+        names = [
+            name for name, parameter in signature.parameters.items()
+            if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+        ]
+        if names and names[0] in ("self", "cls"):
+            names = names[1:]
+        names = names[:nb_inputs]
+        if len(names) < nb_inputs:
+            raise ValueError(f"Pattern {pattern} has {nb_inputs} input(s), {function.__qualname__} only "
+                             f"takes {len(names)}.")
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            outputs = function(*args, **kwargs)
+            if not _enabled:
+                return outputs
+
+            contract_stats.calls += 1
+            stats.calls += 1
+            if contract_stats.calls % sample_rate:
+                return outputs
+
+            contract_stats.checks += 1
+            stats.checks += 1
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                check_contract(compiled, [bound.arguments[name] for name in names], outputs, constraints)
+            except (AssertionError, OutputsNumberError):
+                contract_stats.violations += 1
+                stats.violations += 1
+                if strict:
+                    raise
+            return outputs
+
+        wrapper.contract = contract_stats
+        return wrapper
+
+    return decorator
@@ -1,11 +1,52 @@
-import torch
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Sequence
+from concurrent.futures import FIRST_EXCEPTION, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager, nullcontext
+import asyncio
+import copy
+import inspect
 import random
+import sys
 
 from dim_checker.errors.dimchecker_errors import OutputsNumberError
-from dim_checker.objects import Pattern, Constraints, Formula
-from dim_checker.objects import Vector
-from dim_checker.utils import evaluate_formula
+from dim_checker.errors.resource_errors import ResourceLimitError
+from dim_checker.errors.shape_errors import DimensionError
+from dim_checker.objects import Constraints, CompiledPattern, CompiledVectorFormula
+from dim_checker.objects import Vector, get_backend, compile_pattern, PhaseReport, TrialReport, CheckReport, CaseReport, BatchReport
+from dim_checker.execution import compile_count, forward_context, mark_dynamic, module_state, to_channels_last
+from dim_checker.isolation import IsolatedWorker
+from dim_checker.profiling import measure_phase, tracing
+from dim_checker.tracing import LayerTrace, record_layers
+from dim_checker.sizes import SizeSelector
+# torch is only imported when needed, e.g. when a torch vector is created.
+if TYPE_CHECKING:
+    import torch
+
+    from dim_checker.objects import InputPool
+    from dim_checker.result_cache import ResultCache
+
+
+def is_module(function: Callable) -> bool:
+    """Check if the callable is a nn module, without importing torch if it has not been imported yet.
+
+    Args:
+        function (Callable): function or nn module.
+
+    Returns:
+        bool: True if the callable is a nn module.
+    """
+    return "torch" in sys.modules and isinstance(function, sys.modules["torch"].nn.Module)
+
+
+def is_coroutine_function(function: Callable) -> bool:
+    """Check if the callable is a coroutine function or an object with an async __call__ method.
+
+    Args:
+        function (Callable): function or callable object.
+
+    Returns:
+        bool: True if calling the callable returns a coroutine.
+    """
+    return inspect.iscoroutinefunction(function) or inspect.iscoroutinefunction(getattr(function, "__call__", None))
 
 
 class DimChecker:
@@ -16,26 +57,155 @@ class DimChecker:
     def __init__(self,
                  eval_value="random",
                  eval_type="torch",
-                 eval_device=torch.device("cpu"),
+                 eval_device=None,
                  max_size=100,
-                 depth=1):
+                 depth=1,
+                 eval_mode="real",
+                 workers=1,
+                 executor="thread",
+                 symbolic=False,
+                 input_pool=None,
+                 max_numel=None,
+                 max_bytes=None,
+                 max_total_numel=None,
+                 max_total_bytes=None,
+                 profile=False,
+                 profile_hook=None,
+                 trace_layers=False,
+                 dtype=None,
+                 result_cache=None,
+                 inference_mode=True,
+                 module_eval=True,
+                 autocast=False,
+                 channels_last=False,
+                 compile_mode=None,
+                 shrink_budget=16,
+                 staged=False,
+                 concurrency=16,
+                 isolated=False,
+                 memory_limit=None,
+                 timeout=None):
         """Initialize DimChecker.
 
         Args:
             eval_value (str, optional): callable evaluation point. Available options are "random", "ones", 
             "zeros", and float or int (in this case all elements of the input vector equal eval_value). 
             Defaults to "random".
-            eval_type (str, optional): type of the input tensor. Available options are "torch", "numpy". Defaults to "torch".
+            eval_type (str, optional): type of the input tensor. Available options are "torch", "numpy", and the backends 
+            added with register_backend. Defaults to "torch".
+            eval_device (torch.device, optional): device of the torch input tensors. Defaults to None (cpu).
             max_size (int, optional): maximum size of an input dimension. One may consider reducing this parameter when 
             using large neural networks requiring heavy computing ressources. Defaults to 100.
-            depth (int, optional): Number of tests to run with differents input dimensions. Increasing the depth reduces the 
-            risk of collisions but also increases the runtime. Defaults to 1.
+            depth (int, optional): Number of tests to run with differents input dimensions. Dimensions sizes are chosen 
+            such that all the dimensions of the pattern take distinct values whenever possible (see CheckReport.collision_free), 
+            increasing the depth further reduces the risk of collisions but also increases the runtime. Defaults to 1.
+            eval_mode (str, optional): how the callable is evaluated. Available options are "real" and "meta". 
+            With "meta" the inputs and the parameters of nn modules are created on the torch meta device so that 
+            only the shapes are propagated, no memory is allocated for the data. Callables that cannot run on meta 
+            tensors are evaluated on real tensors instead. Only available with eval_type "torch". Defaults to "real".
+            workers (int, optional): number of workers running the trials in parallel. Torch intra-op threads are 
+            shared between the workers. Defaults to 1.
+            executor (str, optional): pool used when workers > 1. Available options are "thread" (efficient for torch 
+            operations, which release the GIL) and "process" (the callable must then be picklable). Defaults to "thread".
+            symbolic (bool, optional): first trace the callable once with symbolic dimensions (torch only). If the 
+            symbolic output shapes match the output formulas the check is a proof and no trial is run, otherwise 
+            the usual trials are run. Defaults to False.
+            input_pool (InputPool, optional): pool reusing random input vectors across trials and tests, 
+            the tested callables must then not modify their inputs in place. Defaults to None.
+            max_numel (int, optional): maximum number of elements of each input. Dimensions sizes are chosen 
+            smaller when needed. Defaults to None.
+            max_bytes (int, optional): maximum number of bytes of each input. Defaults to None.
+            max_total_numel (int, optional): maximum number of elements of all the inputs of a trial. Defaults to None.
+            max_total_bytes (int, optional): maximum number of bytes of all the inputs of a trial. Defaults to None.
+            profile (bool, optional): measure the wall time and peak memory of each phase of the tests (parse, inputs, 
+            forward and check), the measures are available in the reports. Defaults to False.
+            profile_hook (Callable, optional): function called with the PhaseReport of each measured phase, e.g. to 
+            feed a metrics pipeline. Defaults to None.
+            trace_layers (bool, optional): record the shapes of the layers of nn modules during the trials with forward 
+            hooks. When an output dimension is wrong, the error names the layer which lost it and holds the trace 
+            (error.layer and error.layer_trace). Defaults to False.
+            dtype (str, optional): dtype of the input vectors, e.g. "float16", "bfloat16", "int8" or "bool". Smaller 
+            dtypes reduce the memory used by the inputs. Defaults to None (float32 for torch, float64 for numpy).
+            result_cache (ResultCache, optional): persistent cache of the passed tests. Tests already passed by the 
+            same code with the same pattern, constraints and settings are skipped (see CheckReport.cached). 
+            Defaults to None.
+            inference_mode (bool, optional): call the torch callables under torch.inference_mode, no autograd graph 
+            is kept in memory. Defaults to True.
+            module_eval (bool, optional): switch nn modules to eval mode during the test. Defaults to True.
+            autocast (bool, optional): call the torch callables under bfloat16 autocast. Defaults to False.
+            channels_last (bool, optional): give the 4D torch inputs in the channels last memory format. Defaults to False.
+            The nn modules are placed on eval_device during the test. Modes and devices are restored afterwards.
+            compile_mode (str, optional): how sizes are chosen for callables compiled with torch.compile, which are 
+            recompiled for each new input shape. Available options are None, "dynamic" (the input dimensions depending 
+            on free variables are marked dynamic) and "fixed" (the same sizes are drawn for a pattern during the whole 
+            session of the checker, compile caches then get hits). The compilations are counted in the reports 
+            (CheckReport.compiles). Defaults to None.
+            shrink_budget (int, optional): maximum number of extra forward passes run after a failing trial to find 
+            the cheapest variables values still failing. They are attached to the error (error.variables and 
+            error.seed) and can be replayed with run_trial. 0 disables shrinking. Defaults to 16.
+            staged (bool, optional): run the first trial with the smallest distinct primes, a cheap smoke trial 
+            catching most errors. The other depth - 1 trials run at full size only if it passes. Defaults to False.
+            concurrency (int, optional): maximum number of trials awaited at the same time by test_dims_async 
+            and atest_many. Defaults to 16.
+            isolated (bool, optional): run the trials of test_dims and test_many one at a time in a worker subprocess, 
+            so that a trial exhausting the memory or hanging does not take the checker down. A worker is started 
+            for each test, with the current state of the callable and of the settings, and reused by the trials 
+            of the test (the callable must be picklable on platforms without fork). Defaults to False.
+            memory_limit (int, optional): number of bytes a trial may allocate. Trials whose inputs alone exceed it 
+            are rejected before any allocation, and isolated workers have their address space capped accordingly 
+            (RLIMIT_AS, Unix only). Limit hits raise ResourceLimitError. Defaults to None.
+            timeout (float, optional): maximum duration of an isolated trial in seconds, the worker is killed 
+            and TrialTimeoutError raised when it is exceeded. Requires isolated. Defaults to None.
         """
+        if eval_mode not in ["real", "meta"]:
+            raise ValueError(f"Evaluation mode must be either real or meta, got {eval_mode}.")
+        if eval_mode == "meta" and eval_type != "torch":
+            raise ValueError(f"Evaluation mode meta is only available with torch evaluation type, got {eval_type}.")
+        if compile_mode not in [None, "dynamic", "fixed"]:
+            raise ValueError(f"Compile mode must be either None, dynamic or fixed, got {compile_mode}.")
+        if executor not in ["thread", "process"]:
+            raise ValueError(f"Executor must be either thread or process, got {executor}.")
+        if timeout is not None and not isolated:
+            raise ValueError("A trial timeout requires isolated trials, set isolated=True.")
+
         self.eval_value = eval_value
         self.eval_type = eval_type
         self.eval_device = eval_device
         self.max_size = max_size
         self.depth = depth
+        self.eval_mode = eval_mode
+        self.workers = workers
+        self.executor = executor
+        self.symbolic = symbolic
+        self.input_pool = input_pool
+        self.profile = profile
+        self.profile_hook = profile_hook
+        self.trace_layers = trace_layers
+        self.dtype = dtype
+        self.result_cache = result_cache
+        self.inference_mode = inference_mode
+        self.module_eval = module_eval
+        self.autocast = autocast
+        self.channels_last = channels_last
+        self.compile_mode = compile_mode
+        self.shrink_budget = shrink_budget
+        self.staged = staged
+        self.concurrency = concurrency
+        self.isolated = isolated
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        # seed of the trials of the session in fixed compile mode
+        self.session_seed = random.getrandbits(32)
+
+        # the bytes budgets are converted into numbers of elements
+        itemsize = get_backend(eval_type).itemsize(dtype)
+        numel_budgets = [max_numel, max_bytes and max_bytes // itemsize]
+        total_numel_budgets = [max_total_numel, max_total_bytes and max_total_bytes // itemsize]
+        self.size_selector = SizeSelector(
+            max_size,
+            min([b for b in numel_budgets if b is not None], default=None),
+            min([b for b in total_numel_budgets if b is not None], default=None),
+        )
 
     def __repr__(self) -> str:
         """String representation of the DimChecker.
@@ -45,115 +215,511 @@ class DimChecker:
         """
         return f"DimChecker object with following attributes: {self.__dict__}"
 
-    def __get_primes(self, nb_primes: int) -> list[int]:
-        """Get n dictint prime numbers. This function takes into account the 
-        max_size argument of the current DimChecker.
+    def __get_variables_values(self, pattern: CompiledPattern,
+                               constraints: Constraints, rng: random.Random) -> dict:
+        """Set a fixed value for each dimension. We use prime numbers > 3 to reduce the risk of 
+        collisions when comparing the output shape. 
 
         Args:
-            nb_primes (int): number of primes to return.
+            pattern (CompiledPattern): compiled pattern object.
+            constraints (Constraints): constraints and relations on variables.
+            rng (random.Random): random generator of the trial.
 
         Returns:
-            list[int]: list of the n different primes all smaller than self.max_size.
+            dict: dimensions dictionnary. A prime number is assigned to each dimension variables.
         """
-        l_primes = [
-            5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67,
-            71, 73, 79, 83, 89, 97
-        ]
-        # find the list of primes under max dim
-        primes = [p for p in l_primes if p < self.max_size]
-        if len(primes) < nb_primes:
-            raise ValueError(
-                "Not enough primes to test each dimension. Please consider increasing max_dim."
-            )
-        return random.sample(primes, nb_primes)
+        # get different primes within the inputs budget and merge them with the constraints
+        return self.size_selector.select(pattern, constraints, rng)
 
-    def __get_variables_values(self, in_formula: Formula,
-                               constraints: dict) -> dict:
-        """Set a fixed value for each dimension. We use prime numbers > 3 to reduce the risk of 
-        collisions when comparing the output shape. 
+    def __get_input(self, in_vf: CompiledVectorFormula,
+                  variables: dict, device: "torch.device") -> Vector:
+
+        # compute input shape
+        shape = in_vf.evaluate(variables)
+        return Vector(shape, self.eval_value, self.eval_type, device, self.input_pool, self.dtype)
+
+    def __phase(self, name: str, phases: list[PhaseReport], pattern: str, seed: int = None):
+        """Context measuring a phase of a test when profiling.
 
         Args:
-            in_formula (Formula): input formula object.
-            constraints (dict): constraints dictionnary.
+            name (str): name of the phase.
+            phases (list[PhaseReport]): reports of the phases, the report of this phase is appended.
+            pattern (str): tested pattern.
+            seed (int, optional): seed of the trial. Defaults to None.
 
         Returns:
-            dict: dimensions dictionnary. A prime number is assigned to each dimension variables.
+            ContextManager: context of the phase.
         """
+        if not self.profile:
+            return nullcontext()
+        # tensors allocated by torch on the cpu are not visible to tracemalloc
+        device = None
+        if self.eval_type == "torch" and self.eval_device is not None:
+            import torch
+            # devices may be given as strings, e.g. "cuda:0"
+            device = torch.device(self.eval_device)
+        traced = name == "parse" or self.eval_type != "torch" or (device is not None and device.type == "cuda")
+        return measure_phase(name, phases, pattern, seed, self.profile_hook, device, traced)
 
+    def __recording(self, function: Callable, trace: Optional[LayerTrace]):
+        """Context recording the layers of the callable in the trace, if any.
 
-        # merge all needed variables from the differents vector formulas.
-        variables = set()
-        for vf in in_formula.vector_formulas:
-            variables = variables | vf.variables
+        Args:
+            function (Callable): function or nn module to test.
+            trace (Optional[LayerTrace]): trace of the layers, None when not tracing.
 
+        Returns:
+            ContextManager: context of the recording.
+        """
+        if trace is None:
+            return nullcontext()
+        return record_layers(function, trace)
 
-        # get different primes and assign them to variables
-        primes = self.__get_primes(len(variables))
-        d = dict(zip(variables, primes))
-        # merge with the constraints
-        return d | constraints
+    def __get_outputs(self, function: Callable, pattern: CompiledPattern,
+                      variables: dict, phases: list[PhaseReport], seed: int,
+                      trace: Optional[LayerTrace], constrained: Iterable[str] = ()) -> tuple:
+        """Evaluate the callable on inputs built from the variables values. In meta evaluation mode the 
+        callable is first evaluated on meta tensors, and on real tensors if this fails.
 
-    def __get_input(self, in_dims: list[str],
-                  variables: dict) -> Vector:
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            variables (dict): variables values.
+            phases (list[PhaseReport]): reports of the phases of the trial.
+            seed (int): seed of the trial.
+            trace (Optional[LayerTrace]): trace of the layers, None when not tracing.
+            constrained (Iterable[str], optional): constrained variables. Defaults to ().
 
-        # compute input shape
-        shape = [evaluate_formula(dim, variables) for dim in in_dims]
-        return Vector(shape, self.eval_value, self.eval_type, self.eval_device) 
-
-    def __check_out_shape(self, out: torch.Tensor, out_dims: list,
-                      variables: dict) -> None:
-
-        # check if the shapes have the same length
-        error_str = f"The output shape does not have the expected number of dimensions. Expect {len(out_dims)} and got {len(out.shape)}."
-        assert len(out.shape) == len(out_dims), error_str
-
-        for dim, out_dim in zip(out_dims, out.shape):
-            # the dimension is a formula
-            if len(dim) > 1:
-                error_str = f"Unexpected output shape. Issue with dimension '{dim}'."
-                assert evaluate_formula(dim, variables) == out_dim, error_str
-            # the dimension is a letter
-            else:
-                if dim in variables:
-                    # we need to check dim equality
-                    error_str = f"Unexpected output shape. Issue with dimension '{dim}'."
-                    assert int(variables[dim])== out_dim, error_str
-    
-    def __run_one_test(self, function: Callable, pattern: Pattern,
-                      constraints: Constraints) -> None:
+        Returns:
+            tuple: outputs of the callable and evaluation mode used ("real" or "meta").
+        """
+        if self.eval_mode == "meta":
+            try:
+                with self.__phase("inputs", phases, pattern.pattern, seed):
+                    in_vectors = [self.__get_input(in_vf, variables, "meta").eval_vector
+                                  for in_vf in pattern.in_formulas]
+                with self.__phase("forward", phases, pattern.pattern, seed), self.__recording(function, trace), \
+                        self.__forward_context("meta"):
+                    return self.__call_on_meta(function, in_vectors), "meta"
+            except Exception:
+                # data dependent operations (e.g. .item()) or tensors captured by the callable 
+                # cannot be used with meta tensors, we fall back to real tensors.
+                pass
+
+        with self.__phase("inputs", phases, pattern.pattern, seed):
+            in_vectors = [self.__get_input(in_vf, variables, self.eval_device).eval_vector
+                          for in_vf in pattern.in_formulas]
+            if self.channels_last and self.eval_type == "torch":
+                in_vectors = to_channels_last(in_vectors)
+            if self.compile_mode == "dynamic" and self.eval_type == "torch":
+                mark_dynamic(in_vectors, pattern.in_formulas, set(pattern.in_variables) - set(constrained))
+        with self.__phase("forward", phases, pattern.pattern, seed), self.__recording(function, trace), \
+                self.__forward_context(self.eval_device):
+            return function(*in_vectors), "real"
+
+    def __forward_context(self, device: "torch.device"):
+        """Context of a forward call of a torch callable, see execution.forward_context.
+
+        Args:
+            device (torch.device): device of the inputs.
+
+        Returns:
+            ContextManager: context of the forward call.
+        """
+        if self.eval_type != "torch":
+            return nullcontext()
+        # autocast does not change the shapes, it is useless on meta tensors
+        return forward_context(device, self.inference_mode, self.autocast and str(device) != "meta")
+
+    def __module_state(self, function: Callable):
+        """Context preparing a nn module for the test, see execution.module_state.
+
+        Args:
+            function (Callable): function or nn module to test.
+
+        Returns:
+            ContextManager: context of the test.
+        """
+        if self.eval_type != "torch" or not is_module(function):
+            return nullcontext()
+        return module_state(function, self.eval_device, self.module_eval)
+
+    def __call_on_meta(self, function: Callable, in_vectors: list) -> "torch.Tensor":
+        """Call the function on meta inputs. The parameters and buffers of nn modules are replaced by 
+        meta tensors for the call only, the module itself is not modified.
+
+        Args:
+            function (Callable): function or nn module to test.
+            in_vectors (list): meta input tensors.
+
+        Returns:
+            torch.Tensor: outputs of the callable.
+        """
+        import torch
+        if isinstance(function, torch.nn.Module):
+            tensors = {
+                name: torch.empty_like(t, device="meta")
+                for name, t in [*function.named_parameters(), *function.named_buffers()]
+            }
+            return torch.func.functional_call(function, tensors, tuple(in_vectors))
+        return function(*in_vectors)
+
+    def __run_one_test(self, function: Callable, pattern: CompiledPattern,
+                      constraints: Constraints, seed: int, variables: dict = None) -> TrialReport:
         """Run a single test on the output dimensions. Raise error if the output pattern does not match
-        the output dimensions.
+        the output dimensions. Failures are shrunk to the cheapest variables values still failing, 
+        see __shrink.
 
         Args:
             f (Callable): function or nn module to test.
-            pattern (Pattern): pattern describing the input and expected output dimensions.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
             constraints (Constraints): constraints on variables.
+            seed (int): seed of the random generator used to draw the variables values.
+            variables (dict, optional): variables values replayed instead of drawing them from the seed. 
+            Defaults to None.
+
+        Returns:
+            TrialReport: variables values and evaluation mode used for the test.
         """
         # get evaluation primes for variables and apply constraints
-        eval_variables = self.__get_variables_values(pattern.in_formula, constraints.constraints)
-        
-        
-        # get input vectors
-        in_vectors = []
-        for in_vf in pattern.in_formula.vector_formulas:
-            in_vectors += [self.__get_input(in_vf.dims, eval_variables).eval_vector]
+        if variables is None:
+            variables = self.__get_variables_values(pattern, constraints, random.Random(seed))
+        try:
+            return self.__run_on_variables(function, pattern, constraints, variables, seed)
+        except (AssertionError, OutputsNumberError) as error:
+            shrunk = self.__shrink(function, pattern, constraints, variables, seed, error)
+            if shrunk is error:
+                raise
+            raise shrunk from error
 
+    def __run_on_variables(self, function: Callable, pattern: CompiledPattern, constraints: Constraints,
+                           eval_variables: dict, seed: int) -> TrialReport:
+        """Evaluate the callable on inputs built from the variables values and check the outputs.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            eval_variables (dict): variables values, including the constraints.
+            seed (int): seed of the trial.
+
+        Returns:
+            TrialReport: variables values and evaluation mode used for the test.
+        """
+        self.__check_memory(pattern, eval_variables)
         # get outputs
-        outputs = function(*in_vectors)
+        phases = []
+        trace = LayerTrace() if self.trace_layers and is_module(function) else None
+        compiles = compile_count()
+        outputs, eval_mode = self.__get_outputs(function, pattern, eval_variables, phases, seed, trace,
+                                                constraints.constraints.keys() | constraints.derived.keys())
+        compiles = compile_count() - compiles
+        return self.__check_outputs(pattern, eval_variables, outputs, eval_mode, phases, seed, trace, compiles)
+
+    def __check_memory(self, pattern: CompiledPattern, eval_variables: dict) -> None:
+        """Pre-flight estimate of the bytes of the inputs of a trial, evaluated from the input formulas 
+        before any allocation.
+
+        Args:
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            eval_variables (dict): variables values, including the constraints.
+
+        Raises:
+            ResourceLimitError: error raised if the inputs exceed the memory limit.
+        """
+        if self.memory_limit is None:
+            return
+        itemsize = get_backend(self.eval_type).itemsize(self.dtype)
+        nbytes = sum(self.size_selector.numels(pattern, eval_variables)) * itemsize
+        if nbytes > self.memory_limit:
+            raise ResourceLimitError("memory", f"{self.memory_limit} bytes",
+                                     f"The inputs of the trial need {nbytes} bytes ({eval_variables}).")
+
+    def __check_outputs(self, pattern: CompiledPattern, eval_variables: dict, outputs, eval_mode: str,
+                        phases: list[PhaseReport], seed: int, trace: Optional[LayerTrace] = None,
+                        compiles: int = 0) -> TrialReport:
+        """Check the outputs of a trial against the output formulas.
+
+        Args:
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            eval_variables (dict): variables values of the trial.
+            outputs: outputs of the callable.
+            eval_mode (str): evaluation mode used ("real" or "meta").
+            phases (list[PhaseReport]): reports of the phases of the trial.
+            seed (int): seed of the trial.
+            trace (Optional[LayerTrace], optional): trace of the layers, None when not tracing. Defaults to None.
+            compiles (int, optional): number of frames compiled during the trial. Defaults to 0.
+
+        Returns:
+            TrialReport: variables values and evaluation mode used for the test.
+        """
         # if there is only one output we convert it to a tuple
         if not isinstance(outputs, tuple):
             outputs=(outputs,)
 
-        # check if the number of outputs corresponds to the expected number.
-        if len(outputs)!=len(pattern.out_formula.vector_formulas):
-            raise OutputsNumberError(len(outputs), len(pattern.out_formula.vector_formulas))
+        with self.__phase("check", phases, pattern.pattern, seed):
+            # check if the number of outputs corresponds to the expected number.
+            if len(outputs)!=len(pattern.out_formulas):
+                raise OutputsNumberError(len(outputs), len(pattern.out_formulas))
+
+            # check outputs dimensions, output variables which are not inputs variables are bound 
+            # to the first output dimension they describe.
+            out_variables = dict(eval_variables)
+            backend = get_backend(self.eval_type)
+            try:
+                for out, out_vf in zip(outputs, pattern.out_formulas):
+                    out_vf.match(backend.shape(out), out_variables)
+            except DimensionError as error:
+                if trace is not None:
+                    self.__locate_error(error, pattern, out_variables, trace)
+                raise
+
+        collisions = self.size_selector.collisions(pattern, eval_variables)
+        return TrialReport(eval_variables, eval_mode, seed, collisions=collisions, phases=phases, compiles=compiles)
+
+    def __locate_error(self, error: DimensionError, pattern: CompiledPattern, variables: dict,
+                       trace: LayerTrace) -> None:
+        """Attach the layers trace and the layer which lost the wrong dimension to the error.
+
+        Args:
+            error (DimensionError): error raised when checking the outputs.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            variables (dict): variables values.
+            trace (LayerTrace): trace of the layers of the trial.
+        """
+        error.layer_trace = trace
+        dim = next(dim for dim in pattern.dims if dim.dim == error.dim)
+        if dim.variables <= variables.keys():
+            error.layer = trace.diverging_layer(dim.evaluate(variables))
+
+    def __shrink(self, function: Callable, pattern: CompiledPattern, constraints: Constraints, variables: dict,
+                 seed: int, error: Exception) -> Exception:
+        """Search the cheapest variables values, by number of input elements, for which the test still fails 
+        with the same error type. The smallest distinct values are tried first, then each variable is lowered 
+        in turn, the largest first. The constraints and relations are respected. At most self.shrink_budget extra forward passes are run. The variables 
+        values and the seed are attached to the returned error (error.variables and error.seed), the values 
+        can be replayed with run_trial.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints and relations on variables, kept unchanged.
+            variables (dict): variables values of the failing trial.
+            seed (int): seed of the failing trial.
+            error (Exception): error of the failing trial.
+
+        Returns:
+            Exception: error of the cheapest failing trial.
+        """
+        free = self.size_selector.free_variables(pattern, constraints)
+        tables = constraints.tables(free, self.size_selector.primes, self.size_selector.max_size)
+        cost = lambda v: sum(self.size_selector.numels(pattern, v))
+        budget = self.shrink_budget
+
+        def fails(candidate: dict) -> Optional[Exception]:
+            try:
+                self.__run_on_variables(function, pattern, constraints, candidate, seed)
+            except type(error) as candidate_error:
+                return candidate_error
+            except Exception:
+                # e.g. inputs too small for a convolution kernel, this is not the same failure
+                pass
+            return None
+
+        # the smallest distinct values
+        try:
+            smallest = self.size_selector.smallest(pattern, constraints)
+        except ValueError:
+            smallest = variables
+        if budget > 0 and cost(smallest) < cost(variables):
+            budget -= 1
+            smallest_error = fails(smallest)
+            if smallest_error is not None:
+                variables, error = smallest, smallest_error
+
+        # then each variable is lowered to the smallest value still failing, the others keep their values
+        for var in sorted(free, key=variables.get, reverse=True):
+            used = {variables[v] for v in free if v != var}
+            for value in tables[var]:
+                if value >= variables[var] or budget <= 0:
+                    break
+                if value in used:
+                    continue
+                lowered = constraints.derive({v: variables[v] for v in free} | {var: value} | constraints.constraints)
+                if lowered is None:
+                    continue
+                budget -= 1
+                lowered_error = fails(lowered)
+                if lowered_error is not None:
+                    variables, error = lowered, lowered_error
+                    break
+
+        self.__annotate(error, pattern, variables, seed)
+        return error
+
+    def __annotate(self, error: Exception, pattern: CompiledPattern, variables: dict, seed: int) -> None:
+        """Attach the variables values and the seed of a failing trial to its error.
+
+        Args:
+            error (Exception): error of the trial.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            variables (dict): variables values of the trial.
+            seed (int): seed of the trial.
+        """
+        error.variables = variables
+        error.seed = seed
+        if hasattr(error, "add_note"):
+            numel = sum(self.size_selector.numels(pattern, variables))
+            error.add_note(f"Reproduced with variables {variables} (seed {seed}, {numel} input elements).")
+
+    def __run_symbolic_test(self, function: Callable, pattern: CompiledPattern,
+                            constraints: Constraints, seed: int) -> Optional[TrialReport]:
+        """Try to prove the output dimensions with a single symbolic trace of the callable.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            seed (int): seed of the random generator used to draw the example variables values.
+
+        Returns:
+            Optional[TrialReport]: report of the symbolic trial, None if the proof failed.
+        """
+        from dim_checker.symbolic import verify_symbolic
+
+        hints = self.__get_variables_values(pattern, constraints, random.Random(seed))
+        try:
+            guards = verify_symbolic(function, pattern, constraints.constraints, hints,
+                                     self.__guard_samples(pattern, constraints, hints))
+        except Exception:
+            # the callable cannot be traced symbolically, e.g. data dependent control flow
+            return None
+        if guards is None:
+            return None
+        return TrialReport(hints, "symbolic", seed, guards)
+
+    def __guard_samples(self, pattern: CompiledPattern, constraints: Constraints, hints: dict) -> list[dict]:
+        """Sizes a symbolic proof must hold for: each free variable in turn takes small, large and power of 
+        two values (beyond max_size too), the others keep their example values. Samples breaking a relation 
+        or giving a non positive dimension are left out, the pattern does not cover them.
+
+        Args:
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            hints (dict): example value of each variable.
+
+        Returns:
+            list[dict]: values of the free variables.
+        """
+        free = self.size_selector.free_variables(pattern, constraints)
+        samples = []
+        for var in free:
+            for value in [2, 3, 4, 5, 6, 7, 8, 9, 11, 13, 16, 17, 31, 32, 64, 97, 128, 257, 1024]:
+                variables = constraints.derive({v: hints[v] for v in free} | {var: value} | constraints.constraints)
+                if variables is None:
+                    continue
+                try:
+                    sizes = [size for vf in pattern.in_formulas + pattern.out_formulas
+                             if vf.variables <= variables.keys() for size in vf.evaluate(variables)]
+                except ZeroDivisionError:
+                    continue
+                if all(size > 0 for size in sizes):
+                    samples.append({v: variables[v] for v in free})
+        return samples
+
+    def run_trial(self, function: Callable, pattern: str, constraints: dict, seed: int,
+                  variables: dict = None, relations: Sequence[str] = ()) -> TrialReport:
+        """Run a single test on the output dimensions. This is the unit of work sent to the workers 
+        when trials run in parallel, hence the pattern and constraints are given unparsed.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            seed (int): seed of the random generator used to draw the variables values.
+            variables (dict, optional): variables values replayed instead of drawing them from the seed, e.g. 
+            the values attached to an error. Defaults to None.
+            relations (Sequence[str], optional): relations between dimensions. Defaults to ().
+
+        Returns:
+            TrialReport: variables values and evaluation mode used for the test.
+        """
+        return self.__run_one_test(function, compile_pattern(pattern), Constraints(constraints, relations),
+                                   seed, variables)
+
+    def __run_parallel_trials(self, function: Callable, pattern: str, constraints: dict,
+                              relations: Sequence[str], seeds: list[int]) -> list[TrialReport]:
+        """Run the trials on a pool of workers. Trials which have not started yet are cancelled as 
+        soon as one trial fails, and the error of the first failing trial is raised.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            relations (Sequence[str]): relations between dimensions.
+            seeds (list[int]): seeds of the trials.
+
+        Returns:
+            list[TrialReport]: reports of the trials, in the order of the seeds.
+        """
+        with self.__worker_pool() as pool:
+            futures = [pool.submit(self.run_trial, function, pattern, constraints, seed, None, relations)
+                       for seed in seeds]
+            _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in not_done:
+                future.cancel()
+            for future in futures:
+                if future.done() and not future.cancelled() and future.exception() is not None:
+                    raise future.exception()
+            return [future.result() for future in futures]
+
+    @contextmanager
+    def __worker_pool(self) -> Iterator[Executor]:
+        """Create the pool of workers. Torch intra-op threads are shared between the workers and 
+        restored when the pool is closed.
+
+        Yields:
+            Executor: pool of self.workers workers.
+        """
+        if self.eval_type != "torch":
+            pool = ProcessPoolExecutor(self.workers) if self.executor == "process" else ThreadPoolExecutor(self.workers)
+            with pool:
+                yield pool
+            return
+
+        import torch
+        nb_threads = torch.get_num_threads()
+        worker_threads = max(1, nb_threads // self.workers)
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(self.workers, initializer=torch.set_num_threads,
+                                       initargs=(worker_threads,))
+        else:
+            pool = ThreadPoolExecutor(self.workers)
+            torch.set_num_threads(worker_threads)
+
+        try:
+            with pool:
+                yield pool
+        finally:
+            torch.set_num_threads(nb_threads)
+
+    def estimate_cost(self, pattern: str, constraints: dict) -> int:
+        """Upper bound of the number of input elements of a test, used to schedule the cheapest tests first.
+
+        Args:
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
 
-        # check outputs dimensions
-        for out, out_vf in zip(outputs, pattern.out_formula.vector_formulas):
-            self.__check_out_shape(out, out_vf.dims, eval_variables)
-            
+        Returns:
+            int: number of input elements of all the trials when every variable takes the largest value.
+        """
+        pattern = compile_pattern(pattern)
+        size = max(self.size_selector.primes, default=1)
+        variables = dict.fromkeys(pattern.in_variables, size) | constraints
+        numel = sum(self.size_selector.numels(pattern, variables))
+        return numel * self.depth
 
-    def test_dims(self, function: Callable, pattern: str, **constraints) -> None:
+    def test_dims(self, function: Callable, pattern: str, *relations: str, **constraints) -> CheckReport:
         """Test the output dimensions and raise error if the output pattern 
         does not match the output dimensions. Because of the rish of collisions this test 
         is not a proof that the output dimensions will always be correct but allow fast testing. 
@@ -165,13 +731,472 @@ class DimChecker:
             -
             -
             -
+            relations: relations between the dimensions, e.g. "h % 8 == 0", "4 <= l <= 64" or "n == 2*c". 
+            They are solved once into candidate values of each variable, tied variables are derived from 
+            the others.
             constraints: constraints over the dimensions used for the tests.
 
+        Returns:
+            CheckReport: report of the trials, e.g. variables values and evaluation mode used.
+        """
+        cached, entry = self.__cache_lookup(function, pattern, constraints, relations)
+        if cached is not None:
+            return cached
+
+        # memory is traced during the whole test rather than started and stopped for each phase
+        with tracing() if self.profile else nullcontext():
+            report = self.__test_dims(function, pattern, constraints, relations)
+
+        self.__cache_add(entry, pattern)
+        return report
+
+    def __cache_lookup(self, function: Callable, pattern: str, constraints: dict,
+                       relations: Sequence[str]) -> tuple[Optional[CheckReport], Optional[tuple[str, str]]]:
+        """Look a test up in the result cache.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            relations (Sequence[str]): relations between dimensions.
+
+        Returns:
+            tuple[Optional[CheckReport], Optional[tuple[str, str]]]: report of the test if it passed before, 
+            otherwise None and the key and fingerprint storing the test once passed, None without result 
+            cache or if the callable cannot be fingerprinted.
         """
-        # parse pattern and constraints
-        test_pattern = Pattern(pattern)
-        constraints =  Constraints(constraints)
-        for _ in range(self.depth):
-            self.__run_one_test(function, test_pattern, constraints)
+        if self.result_cache is None:
+            return None, None
+        key, function_fingerprint = self.result_cache.key(function, pattern, constraints, self.__settings(),
+                                                          relations)
+        if key is None:
+            return None, None
+        if self.result_cache.contains(key):
+            report = CheckReport(pattern, constraints)
+            report.cached = True
+            return report, None
+        return None, (key, function_fingerprint)
+
+    def __cache_add(self, entry: Optional[tuple[str, str]], pattern: str) -> None:
+        """Store a passed test in the result cache, see __cache_lookup.
+
+        Args:
+            entry (Optional[tuple[str, str]]): key and fingerprint of the test, None to not store it.
+            pattern (str): tested pattern.
+        """
+        if entry is not None:
+            self.result_cache.add(*entry, pattern)
+
+    def __settings(self) -> str:
+        """Settings changing the outcome of the tests, used to identify the tests in the result cache.
+
+        Returns:
+            str: settings of the checker.
+        """
+        selector = self.size_selector
+        return repr((self.eval_value, self.eval_type, str(self.eval_device), selector.primes, self.depth,
+                     self.eval_mode, self.symbolic, self.dtype, selector.max_numel, selector.max_total_numel,
+                     self.staged, self.compile_mode, self.module_eval, self.inference_mode, self.autocast))
+
+    def __test_dims(self, function: Callable, pattern: str, constraints: dict,
+                    relations: Sequence[str]) -> CheckReport:
+        """Parse the pattern and constraints and run the trials, see test_dims.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            relations (Sequence[str]): relations between dimensions.
+
+        Returns:
+            CheckReport: report of the trials.
+        """
+        # parse pattern (compiled patterns are cached by pattern string) and constraints
+        phases = []
+        with self.__phase("parse", phases, pattern):
+            test_pattern = compile_pattern(pattern)
+            constraints =  Constraints(constraints, relations)
+        report = CheckReport(pattern, constraints.constraints)
+        report.phases = phases
+        # each trial draws its variables values from its own seed, trials are independent
+        seeds = self.__seeds(self.depth)
+        # the module is prepared once for all the trials, which may run in parallel threads
+        with self.__module_state(function):
+            report.trials = self.__run_trials(function, test_pattern, constraints, seeds)
+        return report
+
+    def __seeds(self, count: int) -> list[int]:
+        """Seeds of the trials of a test, drawn from the random module (seed it for reproducible tests), or 
+        the seeds of the session in fixed compile mode.
 
+        Args:
+            count (int): number of trials.
+
+        Returns:
+            list[int]: seeds of the trials.
+        """
+        if self.compile_mode == "fixed":
+            return [self.session_seed + i for i in range(count)]
+        return [random.getrandbits(32) for _ in range(count)]
+
+    def __run_trials(self, function: Callable, pattern: CompiledPattern, constraints: Constraints,
+                     seeds: list[int]) -> list[TrialReport]:
+        """Run the trials of a test: a symbolic trial if possible, otherwise one trial per seed.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            seeds (list[int]): seeds of the trials.
+
+        Returns:
+            list[TrialReport]: reports of the trials, empty without seeds (depth 0).
+        """
+        if not seeds:
+            return []
+        if self.symbolic and self.eval_type == "torch":
+            trial = self.__run_symbolic_test(function, pattern, constraints, seeds[0])
+            if trial is not None:
+                return [trial]
+
+        if self.isolated:
+            return self.__run_isolated_trials(function, pattern, constraints, seeds)
+
+        trials = []
+        if self.staged:
+            # smoke trial at the smallest sizes, a failure skips the full size trials
+            smallest = self.size_selector.smallest(pattern, constraints)
+            trials.append(self.__run_one_test(function, pattern, constraints, seeds[0], smallest))
+            seeds = seeds[1:]
+
+        if self.workers > 1 and len(seeds) > 1:
+            return trials + self.__run_parallel_trials(function, pattern.pattern, constraints.constraints,
+                                                       constraints.relation_strings, seeds)
+
+        return trials + [self.__run_one_test(function, pattern, constraints, seed) for seed in seeds]
+
+    def __run_isolated_trials(self, function: Callable, pattern: CompiledPattern, constraints: Constraints,
+                              seeds: list[int]) -> list[TrialReport]:
+        """Run the trials of a test one at a time in a worker subprocess started for this test, so that it 
+        runs the current state of the callable and of the settings. The variables are drawn here so that 
+        over budget trials are rejected before reaching the worker.
+
+        Args:
+            function (Callable): function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            seeds (list[int]): seeds of the trials.
+
+        Returns:
+            list[TrialReport]: reports of the trials.
+        """
+        # the worker runs the trials in process, hooks and caches stay in this process
+        checker = copy.copy(self)
+        checker.isolated = False
+        checker.result_cache, checker.profile_hook, checker.workers = None, None, 1
+
+        # smoke trial at the smallest sizes first, see __run_trials
+        replayed = [self.size_selector.smallest(pattern, constraints) if self.staged else None]
+        replayed += [None] * (len(seeds) - 1)
+        trials = []
+        with IsolatedWorker(checker, function, self.memory_limit, self.timeout) as worker:
+            for seed, variables in zip(seeds, replayed):
+                if variables is None:
+                    variables = self.__get_variables_values(pattern, constraints, random.Random(seed))
+                self.__check_memory(pattern, variables)
+                trials.append(worker.run(pattern.pattern, constraints.constraints, seed, variables,
+                                         constraints.relation_strings))
+        return trials
+
+    def infer_pattern(self, function: Callable, in_formula: str, *relations: str, **constraints) -> str:
+        """Infer the output formula of a callable from its input formula. Trials are run with distinct 
+        primes, and each output dimension is fitted as an affine expression of the free input variables or 
+        a monomial of any degree (e.g. "(c*h*w)" for a flatten), or a polynomial of degree 2 if neither 
+        fits. Only as many trials as the fit needs are 
+        run: one per coefficient and one more to check the fit. Constant output dimensions equal to a 
+        constrained variable are written as this variable, e.g. "c" rather than "(3)" when c=3. The trials 
+        are seeded like the ones of test_dims.
+
+        Args:
+            function (Callable): function or nn module.
+            in_formula (str): formula of the inputs, e.g. "bcl" or "bcl, bc".
+            relations: relations between the dimensions, see test_dims.
+            constraints: constraints over the dimensions.
+
+        Raises:
+            ValueError: error raised if the number of outputs or their number of dimensions vary between 
+            trials, or if an output dimension is neither a monomial nor a polynomial of degree at most 2 of the 
+            input variables.
+
+        Returns:
+            str: pattern of the callable, e.g. "bcl->b(2*c+1)l".
+        """
+        import numpy as np
+        from dim_checker.inference import features, fit_formulas, monomials
 
+        # the inputs formulas are compiled as a pattern returning its inputs
+        pattern = compile_pattern(f"{in_formula}->{in_formula}")
+        constraints = Constraints(constraints, relations)
+        free = self.size_selector.free_variables(pattern, constraints)
+        constrained = constraints.constraints.keys() | constraints.derived.keys()
+        backend = get_backend(self.eval_type)
+        samples, observed, ranks = [], [], None
+        # enough seeds for the trials of both degrees
+        seeds = iter(self.__seeds(4 * (len(monomials(free, 1)) + len(monomials(free, 2))) + 8))
+
+        with self.__module_state(function):
+            for degree in [1, 2]:
+                basis = monomials(free, degree)
+                for _ in range(4 * len(basis) + 4):
+                    x = features(basis, free, np.array(samples, dtype=np.int64).reshape(len(samples), len(free)))
+                    if len(samples) > len(basis) and np.linalg.matrix_rank(x) == len(basis):
+                        break
+                    seed = next(seeds)
+                    variables = self.__get_variables_values(pattern, constraints, random.Random(seed))
+                    outputs, _ = self.__get_outputs(function, pattern, variables, [], seed, None, constrained)
+                    if not isinstance(outputs, tuple):
+                        outputs = (outputs,)
+                    shapes = [backend.shape(out) for out in outputs]
+                    if ranks is not None and ranks != [len(shape) for shape in shapes]:
+                        raise ValueError(
+                            f"The outputs of the callable do not have a fixed number of dimensions for {in_formula}."
+                        )
+                    ranks = [len(shape) for shape in shapes]
+                    samples.append([variables[var] for var in free])
+                    observed.append([size for shape in shapes for size in shape])
+
+                observed_array = np.array(observed, dtype=np.int64).reshape(len(samples), -1)
+                formulas = fit_formulas(free, np.array(samples, dtype=np.int64).reshape(len(samples), len(free)),
+                                        observed_array, degree)
+                if all(formula is not None for formula in formulas):
+                    break
+
+        if any(formula is None for formula in formulas):
+            raise ValueError(
+                f"Some output dimensions of the callable are neither monomials nor polynomials of degree at most 2 "
+                f"of the input variables {free}, observed {observed}."
+            )
+        # constant dimensions equal to a constrained variable, in the order of the input formulas
+        names = {}
+        for var in pattern.in_variables:
+            if var in constraints.constraints:
+                names.setdefault(constraints.constraints[var], var)
+        for j, column in enumerate(observed_array.T):
+            if (column == column[0]).all() and int(column[0]) in names:
+                formulas[j] = names[int(column[0])]
+
+        out_formulas, start = [], 0
+        for rank in ranks:
+            out_formulas.append("".join(formulas[start:start + rank]))
+            start += rank
+        return f"{in_formula}->{', '.join(out_formulas)}"
+
+    def __normalize_cases(self, cases: Iterable[tuple]) -> list[tuple[Callable, str, dict, Sequence[str]]]:
+        """Complete the cases of test_many and atest_many with their default constraints and relations.
+
+        Args:
+            cases (Iterable[tuple]): tests described by tuples (function, pattern), (function, pattern, 
+            constraints) or (function, pattern, constraints, relations).
+
+        Returns:
+            list[tuple[Callable, str, dict, Sequence[str]]]: tests as tuples (function, pattern, constraints, 
+            relations).
+        """
+        return [(case[0], case[1], case[2] if len(case) > 2 else {}, case[3] if len(case) > 3 else ())
+                for case in cases]
+
+    def test_many(self, cases: Iterable[tuple]) -> BatchReport:
+        """Test many callables and patterns. Tests are scheduled on self.workers workers, the cheapest 
+        first according to the number of elements of their inputs. Errors do not stop the other tests, 
+        they are collected in the report of the failing test.
+
+        Args:
+            cases (Iterable[tuple]): tests described by tuples (function, pattern), 
+            (function, pattern, constraints) with constraints a dictionary, or (function, pattern, constraints, 
+            relations) with relations a sequence of relations between dimensions.
+
+        Returns:
+            BatchReport: reports of all the tests, in the order of the cases.
+        """
+        cases = self.__normalize_cases(cases)
+        costs = []
+        for _, pattern, constraints, _ in cases:
+            try:
+                costs.append(self.estimate_cost(pattern, constraints))
+            except Exception:
+                # invalid pattern or constraints, the error is reported when running the test
+                costs.append(0)
+        order = sorted(range(len(cases)), key=costs.__getitem__)
+
+        # each test runs its trials serially, the workers are used across tests
+        checker = copy.copy(self)
+        checker.workers = 1
+
+        with self.__worker_pool() as pool:
+            futures = {i: pool.submit(checker.test_dims, cases[i][0], cases[i][1], *cases[i][3], **cases[i][2])
+                       for i in order}
+            reports = []
+            for i, (_, pattern, constraints, _) in enumerate(cases):
+                error = futures[i].exception()
+                report = futures[i].result() if error is None else None
+                reports.append(CaseReport(i, pattern, constraints, costs[i], report, error))
+
+        return BatchReport(reports)
+
+    async def test_dims_async(self, function: Callable, pattern: str, *relations: str, **constraints) -> CheckReport:
+        """Test the output dimensions of an async callable (or a regular one) on an asyncio event loop, see 
+        test_dims. The trials run concurrently, at most self.concurrency at a time, so that the waits of the 
+        callable overlap. nn modules are prepared (eval mode, device) for the whole test. Regular callables run 
+        in the default executor of the loop, under the usual inference mode and autocast context, so that they 
+        do not block the loop. Coroutine functions are awaited on the loop without execution context, since the 
+        context is thread local and would leak to the other trials. Failures are not shrunk, and the memory 
+        limit only applies as a pre-flight estimate of the inputs.
+
+        Args:
+            function (Callable): coroutine function, or function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            relations: relations between the dimensions, see test_dims.
+            constraints: constraints over the dimensions used for the tests.
+
+        Raises:
+            ValueError: error raised if the checker uses settings the async trials do not support: meta 
+            evaluation mode, isolated trials, layers tracing or staged trials.
+
+        Returns:
+            CheckReport: report of the trials.
+        """
+        self.__check_async_settings()
+        with self.__module_state(function):
+            return await self.__test_dims_async(function, pattern, constraints, relations,
+                                                asyncio.Semaphore(self.concurrency))
+
+    def __check_async_settings(self) -> None:
+        """Reject the settings the async trials do not support.
+
+        Raises:
+            ValueError: error raised if the checker uses meta evaluation mode, isolated trials, layers 
+            tracing or staged trials.
+        """
+        unsupported = {
+            "eval_mode='meta'": self.eval_mode == "meta",
+            "isolated": self.isolated,
+            "trace_layers": self.trace_layers,
+            "staged": self.staged,
+        }
+        unsupported = [name for name, used in unsupported.items() if used]
+        if unsupported:
+            raise ValueError(f"Async trials do not support {', '.join(unsupported)}.")
+
+    async def __test_dims_async(self, function: Callable, pattern: str, constraints: dict,
+                                relations: Sequence[str], semaphore: asyncio.Semaphore) -> CheckReport:
+        """Parse the pattern and constraints and run the trials concurrently, see test_dims_async.
+
+        Args:
+            function (Callable): coroutine function, or function or nn module to test.
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            relations (Sequence[str]): relations between dimensions.
+            semaphore (asyncio.Semaphore): semaphore limiting the number of concurrent trials.
+
+        Returns:
+            CheckReport: report of the trials.
+        """
+        cached, entry = self.__cache_lookup(function, pattern, constraints, relations)
+        if cached is not None:
+            return cached
+
+        test_pattern = compile_pattern(pattern)
+        parsed = Constraints(constraints, relations)
+        report = CheckReport(pattern, parsed.constraints)
+        seeds = self.__seeds(self.depth)
+        trials = [asyncio.ensure_future(self.__run_one_test_async(function, test_pattern, parsed, seed, semaphore))
+                  for seed in seeds]
+        try:
+            report.trials = list(await asyncio.gather(*trials))
+        except BaseException:
+            # the first failure stops the other trials
+            for trial in trials:
+                trial.cancel()
+            raise
+
+        self.__cache_add(entry, pattern)
+        return report
+
+    async def __run_one_test_async(self, function: Callable, pattern: CompiledPattern, constraints: Constraints,
+                                   seed: int, semaphore: asyncio.Semaphore) -> TrialReport:
+        """Run a single trial, awaiting the outputs of the callable if needed.
+
+        Args:
+            function (Callable): coroutine function, or function or nn module to test.
+            pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+            constraints (Constraints): constraints on variables.
+            seed (int): seed of the random generator used to draw the variables values.
+            semaphore (asyncio.Semaphore): semaphore limiting the number of concurrent trials.
+
+        Returns:
+            TrialReport: variables values and evaluation mode used for the test.
+        """
+        variables = self.__get_variables_values(pattern, constraints, random.Random(seed))
+        self.__check_memory(pattern, variables)
+        phases = []
+
+        def call(in_vectors: list):
+            with self.__forward_context(self.eval_device):
+                return function(*in_vectors)
+
+        async with semaphore:
+            with self.__phase("inputs", phases, pattern.pattern, seed):
+                in_vectors = [self.__get_input(in_vf, variables, self.eval_device).eval_vector
+                              for in_vf in pattern.in_formulas]
+            if is_coroutine_function(function):
+                outputs = await function(*in_vectors)
+            else:
+                # regular callables would block the loop
+                outputs = await asyncio.get_running_loop().run_in_executor(None, call, in_vectors)
+            if inspect.isawaitable(outputs):
+                outputs = await outputs
+        try:
+            return self.__check_outputs(pattern, variables, outputs, "real", phases, seed)
+        except (AssertionError, OutputsNumberError) as error:
+            self.__annotate(error, pattern, variables, seed)
+            raise
+
+    async def atest_many(self, cases: Iterable[tuple]) -> BatchReport:
+        """Test many async callables and patterns concurrently, see test_many and test_dims_async. The 
+        concurrency limit is shared by the trials of all the tests.
+
+        Args:
+            cases (Iterable[tuple]): tests described by tuples (function, pattern), (function, pattern, 
+            constraints) or (function, pattern, constraints, relations).
+
+        Raises:
+            ValueError: error raised if the checker uses settings the async trials do not support, see 
+            test_dims_async.
+
+        Returns:
+            BatchReport: reports of all the tests, in the order of the cases.
+        """
+        self.__check_async_settings()
+        cases = self.__normalize_cases(cases)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with ExitStack() as stack:
+            # each module is prepared once, cases may share it
+            for function in {id(case[0]): case[0] for case in cases}.values():
+                stack.enter_context(self.__module_state(function))
+            results = await asyncio.gather(
+                *(self.__test_dims_async(function, pattern, constraints, relations, semaphore)
+                  for function, pattern, constraints, relations in cases),
+                return_exceptions=True,
+            )
+
+        reports = []
+        for i, ((_, pattern, constraints, _), result) in enumerate(zip(cases, results)):
+            try:
+                cost = self.estimate_cost(pattern, constraints)
+            except Exception:
+                cost = 0
+            if isinstance(result, BaseException):
+                reports.append(CaseReport(i, pattern, constraints, cost, None, result))
+            else:
+                reports.append(CaseReport(i, pattern, constraints, cost, result, None))
+        return BatchReport(reports)
@@ -21,4 +21,14 @@ class ConstraintDimError(Exception):
         
 
     def __str__(self):
-        return f"""The constraint dimension "{self.dim}" must be a single letter."""
\ No newline at end of file
+        return f"""The constraint dimension "{self.dim}" must be a single letter."""
+
+class ConstraintRelationError(Exception):
+    """Exception raised when a relation between dimensions is not valid."""
+
+    def __init__(self, relation: Any, payload=None) -> None:
+        self.relation = relation
+
+
+    def __str__(self):
+        return f"""The relation "{self.relation}" must be a comparison between dimensions, e.g. "h % 8 == 0" or "4 <= l <= 64"."""
@@ -1,6 +1,10 @@
 class OutputsNumberError(Exception):
     """Exception raised when the number of outputs does not match the expected number of outputs."""
 
+    # set by the checker when shrinking a failing trial
+    variables = None
+    seed = None
+
     def __init__(self, nb_outputs: int, expected: int, payload=None):
         self.nb_outputs = nb_outputs
         self.expected = expected
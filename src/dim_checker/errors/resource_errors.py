@@ -0,0 +1,23 @@
+from typing import Any
+
+
+class ResourceLimitError(Exception):
+    """Exception raised when a trial exceeds its memory or time budget."""
+
+    def __init__(self, resource: str, limit: Any, detail: str = "", payload=None) -> None:
+        self.resource = resource
+        self.limit = limit
+        self.detail = detail
+        self.payload = payload
+
+
+    def __str__(self):
+        return f"""The trial exceeded its {self.resource} limit of {self.limit}. {self.detail}""".strip()
+
+
+class TrialTimeoutError(ResourceLimitError):
+    """Exception raised when an isolated trial does not finish within its timeout."""
+
+    def __init__(self, timeout: float, payload=None) -> None:
+        super().__init__("time", f"{timeout}s", "The worker running the trial was killed.", payload)
+        self.timeout = timeout
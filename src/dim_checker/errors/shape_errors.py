@@ -0,0 +1,43 @@
+from typing import Sequence
+
+# shape errors subclass AssertionError as shapes used to be checked with assertions.
+
+
+class DimensionNumberError(AssertionError):
+    """Exception raised when a shape does not have the number of dimensions of its vector formula."""
+
+    # set by the checker when shrinking a failing trial
+    variables = None
+    seed = None
+
+    def __init__(self, vector_formula: str, shape: Sequence[int], expected: int, payload=None) -> None:
+        self.vector_formula = vector_formula
+        self.shape = tuple(shape)
+        self.expected = expected
+        self.payload = payload
+
+    def __str__(self):
+        return f"""The shape {self.shape} does not have the expected number of dimensions for "{self.vector_formula}". Expect {self.expected} and got {len(self.shape)}."""
+
+
+class DimensionError(AssertionError):
+    """Exception raised when a dimension of a shape does not match its vector formula."""
+
+    # set by the checker when tracing the layers of a nn module
+    layer = None
+    layer_trace = None
+    # set by the checker when shrinking a failing trial
+    variables = None
+    seed = None
+
+    def __init__(self, vector_formula: str, shape: Sequence[int], dim: str, payload=None) -> None:
+        self.vector_formula = vector_formula
+        self.shape = tuple(shape)
+        self.dim = dim
+        self.payload = payload
+
+    def __str__(self):
+        s = f"""Unexpected shape {self.shape} for "{self.vector_formula}". Issue with dimension '{self.dim}'."""
+        if self.layer is not None:
+            s += f""" First diverging layer: '{self.layer}'."""
+        return s
@@ -0,0 +1,114 @@
+from contextlib import ExitStack, contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator
+import sys
+
+if TYPE_CHECKING:
+    import torch
+
+
+@contextmanager
+def module_state(function: Callable, device: "torch.device" = None, module_eval: bool = True) -> Iterator[None]:
+    """Prepare a nn module for the tests: switch it to eval mode (no dropout, batchnorm uses its running
+    statistics) and place its parameters and buffers on the evaluation device. The modes and devices are
+    restored when leaving the context. Other callables are left untouched.
+
+    Args:
+        function (Callable): function or nn module to test.
+        device (torch.device, optional): evaluation device, None to keep the module where it is. Defaults to None.
+        module_eval (bool, optional): switch the module to eval mode. Defaults to True.
+
+    Yields:
+        Iterator[None]: context of the tests.
+    """
+    import torch
+    if not isinstance(function, torch.nn.Module):
+        yield
+        return
+
+    modes = [(module, module.training) for module in function.modules()]
+    tensors = [*function.parameters(), *function.buffers()]
+    devices = [t.device for t in tensors]
+    if module_eval:
+        function.eval()
+    if device is not None:
+        for t in tensors:
+            t.data = t.data.to(device)
+    try:
+        yield
+    finally:
+        for module, training in modes:
+            module.training = training
+        if device is not None:
+            for t, original in zip(tensors, devices):
+                t.data = t.data.to(original)
+
+
+@contextmanager
+def forward_context(device: "torch.device" = None, inference_mode: bool = True,
+                    autocast: bool = False) -> Iterator[None]:
+    """Context of a forward call: without autograd graph and optionally with bfloat16 autocast. Both are
+    thread local, hence parallel trials do not interfere.
+
+    Args:
+        device (torch.device, optional): evaluation device, used to select the autocast device type.
+        Defaults to None (cpu).
+        inference_mode (bool, optional): run under torch.inference_mode. Defaults to True.
+        autocast (bool, optional): autocast to bfloat16. Defaults to False.
+
+    Yields:
+        Iterator[None]: context of the forward call.
+    """
+    import torch
+    with ExitStack() as stack:
+        if inference_mode:
+            stack.enter_context(torch.inference_mode())
+        if autocast:
+            device_type = torch.device(device or "cpu").type
+            stack.enter_context(torch.autocast(device_type, dtype=torch.bfloat16))
+        yield
+
+
+def to_channels_last(vectors: list) -> list:
+    """Convert the 4D input tensors to the channels last memory format, other inputs are unchanged.
+
+    Args:
+        vectors (list): input vectors.
+
+    Returns:
+        list: input vectors.
+    """
+    import torch
+    return [
+        v.contiguous(memory_format=torch.channels_last) if isinstance(v, torch.Tensor) and v.dim() == 4 else v
+        for v in vectors
+    ]
+
+
+def mark_dynamic(vectors: list, in_formulas: list, free: set) -> None:
+    """Mark the input dimensions depending on free variables as dynamic for torch.compile, so that
+    compiled callables are not recompiled for each new size. Dimensions the compiler specializes
+    anyway (e.g. the input channels of a convolution) stay static.
+
+    Args:
+        vectors (list): input tensors.
+        in_formulas (list): compiled input vector formulas.
+        free (set): variables which are not constrained.
+    """
+    import torch._dynamo
+    for vector, in_vf in zip(vectors, in_formulas):
+        for i, dim in enumerate(in_vf.dims):
+            if dim.variables & free:
+                torch._dynamo.maybe_mark_dynamic(vector, i)
+
+
+def compile_count() -> int:
+    """Number of frames compiled by torch.compile so far in this process. The counter is global,
+    hence compilations triggered by other threads are counted too.
+
+    Returns:
+        int: number of compiled frames, 0 if torch.compile was never used.
+    """
+    if "torch._dynamo" not in sys.modules:
+        return 0
+    from torch._dynamo.utils import counters
+    return counters["frames"]["ok"]
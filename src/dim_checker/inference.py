@@ -0,0 +1,119 @@
+from typing import Optional, Sequence
+import itertools
+
+import numpy as np
+
+
+def monomials(variables: Sequence[str], degree: int) -> list[tuple[str, ...]]:
+    """Monomials of the variables up to a degree, the constant monomial first.
+
+    Args:
+        variables (Sequence[str]): variables, e.g. ["c", "l"].
+        degree (int): maximum degree.
+
+    Returns:
+        list[tuple[str, ...]]: monomials as tuples of variables, e.g. [(), ("c",), ("l",), ("c", "c"), ...].
+    """
+    return [
+        monomial for d in range(degree + 1)
+        for monomial in itertools.combinations_with_replacement(variables, d)
+    ]
+
+
+def features(monomials: list[tuple[str, ...]], variables: Sequence[str], samples: np.ndarray) -> np.ndarray:
+    """Values of the monomials for each sample.
+
+    Args:
+        monomials (list[tuple[str, ...]]): monomials, see monomials.
+        variables (Sequence[str]): variables, in the order of the columns of the samples.
+        samples (np.ndarray): variables values, one row per sample.
+
+    Returns:
+        np.ndarray: monomials values, one row per sample and one column per monomial.
+    """
+    columns = {var: samples[:, i] for i, var in enumerate(variables)}
+    ones = np.ones(len(samples), dtype=np.int64)
+    return np.stack([np.prod([columns[var] for var in m], axis=0) if m else ones for m in monomials], axis=1)
+
+
+def format_formula(monomials: list[tuple[str, ...]], coefficients: np.ndarray) -> str:
+    """Write a dimension of a pattern from the integer coefficients of the monomials.
+
+    Args:
+        monomials (list[tuple[str, ...]]): monomials, see monomials.
+        coefficients (np.ndarray): integer coefficient of each monomial.
+
+    Returns:
+        str: dimension, a single letter when possible, e.g. "l" or "(2*c+1)".
+    """
+    terms = [(int(a), m) for a, m in zip(coefficients, monomials) if a != 0]
+    if len(terms) == 1 and terms[0][0] == 1 and len(terms[0][1]) == 1:
+        return terms[0][1][0]
+    # variables terms first, e.g. "2*c+1" rather than "1+2*c"
+    terms = sorted(terms, key=lambda term: not term[1])
+    formula = ""
+    for a, m in terms:
+        factors = ([str(abs(a))] if abs(a) != 1 or not m else []) + list(m)
+        formula += ("-" if a < 0 else "+" if formula else "") + "*".join(factors)
+    return f"({formula or 0})"
+
+
+def fit_monomials(variables: Sequence[str], samples: np.ndarray, observed: np.ndarray) -> list[Optional[str]]:
+    """Fit each observed dimension as a monomial of any degree with a positive integer coefficient, e.g. 
+    "(c*h*w)" for a flatten, with a single least squares solve of the logarithms for all the dimensions: the
+    exponents are the rounded slopes. A fit is kept only if it reproduces the observations exactly.
+
+    Args:
+        variables (Sequence[str]): variables, in the order of the columns of the samples.
+        samples (np.ndarray): variables values, one row per sample, all greater than 1.
+        observed (np.ndarray): observed dimensions, one row per sample and one column per dimension.
+
+    Returns:
+        list[Optional[str]]: formula of each dimension, None if the dimension is not a monomial.
+    """
+    x = np.concatenate([np.ones((len(samples), 1)), np.log(samples.astype(np.float64))], axis=1)
+    positive = (observed > 0).all(axis=0)
+    y = np.log(np.where(observed > 0, observed, 1).astype(np.float64))
+    exponents = np.rint(np.linalg.lstsq(x, y, rcond=None)[0][1:]).astype(np.int64)
+
+    formulas = []
+    for j in range(observed.shape[1]):
+        if not positive[j] or (exponents[:, j] < 0).any():
+            formulas.append(None)
+            continue
+        # python integers, high degrees overflow int64
+        values = [int(np.prod([int(v) ** int(e) for v, e in zip(row, exponents[:, j])], dtype=object))
+                  for row in samples]
+        coefficient = int(observed[0, j]) // values[0]
+        if coefficient == 0 or any(coefficient * v != int(o) for v, o in zip(values, observed[:, j])):
+            formulas.append(None)
+            continue
+        monomial = tuple(var for var, e in zip(variables, exponents[:, j]) for _ in range(e))
+        formulas.append(format_formula([monomial], np.array([coefficient])))
+    return formulas
+
+
+def fit_formulas(variables: Sequence[str], samples: np.ndarray, observed: np.ndarray,
+                 degree: int) -> list[Optional[str]]:
+    """Fit each observed dimension as a polynomial with integer coefficients of the variables, with a single
+    least squares solve for all the dimensions, or as a monomial of any degree (see fit_monomials) if no 
+    polynomial fits. A fit is kept only if it reproduces the observations exactly.
+
+    Args:
+        variables (Sequence[str]): variables, in the order of the columns of the samples.
+        samples (np.ndarray): variables values, one row per sample.
+        observed (np.ndarray): observed dimensions, one row per sample and one column per dimension.
+        degree (int): maximum degree of the polynomials.
+
+    Returns:
+        list[Optional[str]]: formula of each dimension, None if the dimension could not be fitted.
+    """
+    basis = monomials(variables, degree)
+    x = features(basis, variables, samples)
+    solution = np.linalg.lstsq(x.astype(np.float64), observed.astype(np.float64), rcond=None)[0]
+    coefficients = np.rint(solution).astype(np.int64)
+    exact = (x @ coefficients == observed).all(axis=0)
+    formulas = [format_formula(basis, coefficients[:, j]) if exact[j] else None for j in range(observed.shape[1])]
+    if all(exact) or not len(variables):
+        return formulas
+    return [formula or monomial for formula, monomial in zip(formulas, fit_monomials(variables, samples, observed))]
@@ -0,0 +1,202 @@
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+import multiprocessing
+import os
+
+from dim_checker.errors.resource_errors import ResourceLimitError, TrialTimeoutError
+
+if TYPE_CHECKING:
+    from dim_checker.dim_check import DimChecker
+    from dim_checker.objects import TrialReport
+
+
+def _address_space() -> int:
+    """Size of the address space of the current process, 0 if it cannot be read (non Linux platforms).
+
+    Returns:
+        int: size of the address space in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_memory(memory_limit: int) -> None:
+    """Cap the address space of the current process to its current size plus memory_limit bytes, so that
+    the libraries already mapped (e.g. torch) do not count against the limit. Allocations beyond the cap
+    fail with MemoryError instead of exhausting the memory of the machine.
+
+    Args:
+        memory_limit (int): number of bytes the process may still allocate.
+    """
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows, only the pre-flight estimate applies
+        return
+    limit = _address_space() + memory_limit
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _is_allocation_error(error: BaseException) -> bool:
+    """Check if an error comes from a failed allocation, e.g. MemoryError or the RuntimeError raised by the
+    torch allocators.
+
+    Args:
+        error (BaseException): error raised by a trial.
+
+    Returns:
+        bool: True if the error is a failed allocation.
+    """
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and ("allocate" in message or "out of memory" in message)
+
+
+def _serve(connection, checker: "DimChecker", function: Callable, memory_limit: Optional[int]) -> None:
+    """Main loop of the worker process: run the trials received on the connection until it is closed.
+
+    Args:
+        connection (multiprocessing.connection.Connection): connection to the checker.
+        checker (DimChecker): checker running the trials in the worker.
+        function (Callable): function or nn module to test, received once for all the trials.
+        memory_limit (int, optional): number of bytes the worker may allocate.
+    """
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        pattern, constraints, relations, seed, variables = message
+        try:
+            result = (True, checker.run_trial(function, pattern, constraints, seed, variables, relations))
+        except Exception as error:
+            if _is_allocation_error(error):
+                error = ResourceLimitError("memory", f"{memory_limit} bytes", f"{type(error).__name__}: {error}")
+            result = (False, error)
+        try:
+            connection.send(result)
+        except Exception as error:
+            # errors which cannot be pickled are sent as their representation
+            connection.send((False, RuntimeError(f"{result[1]!r} (not picklable: {error})")))
+
+
+class IsolatedWorker:
+    """Subprocess running the trials of a test under a memory cap and a wall-clock timeout. The worker is
+    started when entering the context, from the current state of the callable and of the checker, and its
+    trials reuse them. A worker which times out or dies is killed and started again for the next trial.
+
+        with IsolatedWorker(checker, function, memory_limit=2**30, timeout=60) as worker:
+            report = worker.run("bcl->bcn", {"n": 1}, seed)
+    """
+
+    def __init__(self, checker: "DimChecker", function: Callable, memory_limit: Optional[int] = None,
+                 timeout: Optional[float] = None) -> None:
+        """Initializes worker.
+
+        Args:
+            checker (DimChecker): checker running the trials in the worker, it must not be isolated itself.
+            function (Callable): function or nn module to test.
+            memory_limit (int, optional): number of bytes the worker may allocate, see _limit_memory.
+            Defaults to None (no limit).
+            timeout (float, optional): maximum duration of a trial in seconds. Defaults to None (no timeout).
+        """
+        self.checker = checker
+        self.function = function
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        self.__process = None
+        self.__connection = None
+
+    def __repr__(self) -> str:
+        """Creates string representation of the worker.
+
+        Returns:
+            str: string representation of the worker.
+        """
+        return f"IsolatedWorker(memory_limit={self.memory_limit}, timeout={self.timeout})"
+
+    def __enter__(self) -> "IsolatedWorker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the worker process, stopping the previous one if any. With the fork start method the
+        callable is inherited, otherwise it must be picklable.
+        """
+        self.close()
+        connection, child = multiprocessing.Pipe()
+        self.__process = multiprocessing.Process(
+            target=_serve, args=(child, self.checker, self.function, self.memory_limit), daemon=True
+        )
+        self.__process.start()
+        child.close()
+        self.__connection = connection
+
+    def run(self, pattern: str, constraints: dict, seed: int, variables: dict = None,
+            relations: Sequence[str] = ()) -> "TrialReport":
+        """Run a trial in the worker, see DimChecker.run_trial.
+
+        Args:
+            pattern (str): pattern describing the input and expected output dimensions.
+            constraints (dict): constraints over the dimensions.
+            seed (int): seed of the random generator used to draw the variables values.
+            variables (dict, optional): variables values replayed instead of drawing them from the seed.
+            Defaults to None.
+            relations (Sequence[str], optional): relations between dimensions. Defaults to ().
+
+        Raises:
+            TrialTimeoutError: error raised if the trial does not finish within the timeout.
+            ResourceLimitError: error raised if the trial exceeds the memory limit or the worker dies.
+
+        Returns:
+            TrialReport: report of the trial.
+        """
+        if self.__process is None or not self.__process.is_alive():
+            self.start()
+        self.__connection.send((pattern, constraints, tuple(relations), seed, variables))
+
+        if not self.__connection.poll(self.timeout):
+            self.close()
+            raise TrialTimeoutError(self.timeout)
+        try:
+            passed, result = self.__connection.recv()
+        except EOFError:
+            self.__process.join()
+            exitcode = self.__process.exitcode
+            self.close()
+            raise ResourceLimitError("memory", f"{self.memory_limit} bytes",
+                                     f"The worker running the trial died with exit code {exitcode}.") from None
+
+        if passed:
+            return result
+        raise result
+
+    def close(self) -> None:
+        """Stop the worker process, if any."""
+        if self.__process is None:
+            return
+        try:
+            self.__connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.__connection.close()
+        self.__process.join(0.1)
+        if self.__process.is_alive():
+            self.__process.kill()
+            self.__process.join()
+        self.__process = None
+        self.__connection = None
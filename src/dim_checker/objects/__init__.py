@@ -1,4 +1,7 @@
 from dim_checker.objects.formulas import Formula, VectorFormula
 from dim_checker.objects.patterns import Pattern
 from dim_checker.objects.constraints import Constraints
-from dim_checker.objects.vectors import Vector
\ No newline at end of file
+from dim_checker.objects.vectors import Vector, InputPool
+from dim_checker.objects.compiled import CompiledDim, CompiledVectorFormula, CompiledPattern, compile_pattern
+from dim_checker.objects.reports import PhaseReport, TrialReport, CheckReport, CaseReport, BatchReport, ValidationReport
+from dim_checker.objects.backends import Backend, register_backend, get_backend
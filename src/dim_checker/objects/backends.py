@@ -0,0 +1,187 @@
+from typing import Any, Sequence
+
+# number of bytes of an element for each dtype name.
+ITEMSIZES = {
+    "float64": 8,
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int64": 8,
+    "int32": 4,
+    "int8": 1,
+    "bool": 1,
+}
+
+
+class Backend:
+    """Array backend creating the input vectors. Backends import their array library lazily, in
+    their methods, so that registering a backend is free.
+    """
+
+    # dtype used when no dtype is given.
+    default_dtype = "float32"
+
+    def random(self, shape: Sequence[int], dtype: str, device: Any) -> Any:
+        """Create a random vector: normally distributed for floating dtypes, uniformly distributed
+        over the dtype range for integer and boolean dtypes.
+
+        Args:
+            shape (Sequence[int]): shape of the vector.
+            dtype (str): dtype name, e.g. "float16".
+            device (Any): device of the vector, None for the default device.
+
+        Returns:
+            Any: random vector.
+        """
+        raise NotImplementedError
+
+    def full(self, shape: Sequence[int], value: float, dtype: str, device: Any) -> Any:
+        """Create a constant vector. Its elements are allocated, so that callables may modify it in place.
+
+        Args:
+            shape (Sequence[int]): shape of the vector.
+            value (float): value of all the elements.
+            dtype (str): dtype name.
+            device (Any): device of the vector, None for the default device.
+
+        Returns:
+            Any: constant vector.
+        """
+        raise NotImplementedError
+
+    def shape(self, vector: Any) -> tuple[int, ...]:
+        """Get the shape of a vector of this backend.
+
+        Args:
+            vector (Any): vector.
+
+        Returns:
+            tuple[int, ...]: shape of the vector.
+        """
+        return tuple(vector.shape)
+
+    def itemsize(self, dtype: str) -> int:
+        """Number of bytes of an element. Backends override it to ask their array library, the default 
+        implementation only knows the common dtypes.
+
+        Args:
+            dtype (str): dtype name, None for the default dtype.
+
+        Raises:
+            ValueError: error raised if the dtype is unknown.
+
+        Returns:
+            int: number of bytes of an element.
+        """
+        dtype = dtype or self.default_dtype
+        try:
+            return ITEMSIZES[dtype]
+        except KeyError:
+            raise ValueError(f"Unknown dtype {dtype}.") from None
+
+
+class TorchBackend(Backend):
+    """Backend creating torch tensors.
+    """
+
+    default_dtype = "float32"
+
+    def random(self, shape: Sequence[int], dtype: str, device: Any) -> Any:
+        """See Backend.random."""
+        import torch
+        dtype = getattr(torch, dtype or self.default_dtype)
+        if dtype == torch.bool:
+            return torch.randint(0, 2, shape, dtype=dtype, device=device)
+        if not dtype.is_floating_point:
+            info = torch.iinfo(dtype)
+            return torch.randint(info.min, info.max, shape, dtype=dtype, device=device)
+        return torch.randn(shape, dtype=dtype, device=device)
+
+    def full(self, shape: Sequence[int], value: float, dtype: str, device: Any) -> Any:
+        """See Backend.full."""
+        import torch
+        dtype = getattr(torch, dtype or self.default_dtype)
+        return torch.full(tuple(shape), value, dtype=dtype, device=device)
+
+    def itemsize(self, dtype: str) -> int:
+        """See Backend.itemsize."""
+        import torch
+        name = dtype or self.default_dtype
+        dtype = getattr(torch, name, None)
+        if not isinstance(dtype, torch.dtype):
+            raise ValueError(f"Unknown torch dtype {name}.")
+        return torch.empty(0, dtype=dtype).element_size()
+
+
+class NumpyBackend(Backend):
+    """Backend creating numpy arrays. Numpy has no bfloat16 dtype.
+    """
+
+    default_dtype = "float64"
+
+    def __dtype(self, dtype: str) -> Any:
+        """Get the numpy dtype from its name."""
+        import numpy as np
+        if dtype == "bfloat16":
+            raise ValueError("The numpy backend does not support the bfloat16 dtype.")
+        try:
+            return np.dtype(dtype or self.default_dtype)
+        except TypeError:
+            raise ValueError(f"Unknown numpy dtype {dtype}.") from None
+
+    def random(self, shape: Sequence[int], dtype: str, device: Any) -> Any:
+        """See Backend.random."""
+        import numpy as np
+        dtype = self.__dtype(dtype)
+        if dtype == np.bool_:
+            return np.random.randint(0, 2, shape).astype(dtype)
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            return np.random.randint(info.min, info.max, shape, dtype=dtype)
+        return np.random.standard_normal(shape).astype(dtype, copy=False)
+
+    def full(self, shape: Sequence[int], value: float, dtype: str, device: Any) -> Any:
+        """See Backend.full."""
+        import numpy as np
+        return np.full(shape, value, dtype=self.__dtype(dtype))
+
+    def itemsize(self, dtype: str) -> int:
+        """See Backend.itemsize."""
+        return self.__dtype(dtype).itemsize
+
+
+# registered backends, by evaluation type.
+BACKENDS = {}
+
+
+def register_backend(name: str, backend: Backend) -> None:
+    """Register an array backend, which can then be used as eval_type.
+
+    Args:
+        name (str): name of the backend, e.g. "torch".
+        backend (Backend): backend.
+    """
+    BACKENDS[name] = backend
+
+
+def get_backend(name: str) -> Backend:
+    """Get a registered array backend.
+
+    Args:
+        name (str): name of the backend.
+
+    Raises:
+        ValueError: error raised if no backend is registered under this name.
+
+    Returns:
+        Backend: backend.
+    """
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Evaluation type must be one of {list(BACKENDS)}, got {name}.") from None
+
+
+register_backend("torch", TorchBackend())
+register_backend("numpy", NumpyBackend())
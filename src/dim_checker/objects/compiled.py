@@ -0,0 +1,193 @@
+from functools import lru_cache
+from typing import Sequence
+
+from dim_checker.errors.shape_errors import DimensionError, DimensionNumberError
+from dim_checker.objects.formulas import VectorFormula
+from dim_checker.objects.patterns import Pattern
+from dim_checker.utils import FORMULA_GLOBALS, compile_formula
+
+
+class CompiledDim:
+    """Dimension of a vector formula lowered once to either a variable name or a code object.
+    """
+
+    __slots__ = ("dim", "variable", "code", "variables")
+
+    def __init__(self, dim: str) -> None:
+        """Initializes compiled dimension.
+
+        Args:
+            dim (str): dimension, either a single letter or an arithmetical expression
+            between parenthesis, e.g. "(2*c+1)".
+        """
+        self.dim = dim
+        self.variable = dim if len(dim) == 1 else None
+        self.code = None if self.variable else compile_formula(dim)
+        self.variables = frozenset(self.code.co_names if self.code else dim)
+
+    def __repr__(self) -> str:
+        """Creates string representation of the compiled dimension.
+
+        Returns:
+            str: string representation of the compiled dimension.
+        """
+        return f"""Compiled dimension: "{self.dim}"."""
+
+    def evaluate(self, variables: dict[str, int]) -> int:
+        """Evaluate the dimension according to the variables values.
+
+        Args:
+            variables (dict[str, int]): variables values, e.g. {"n": 3}.
+
+        Returns:
+            int: value of the dimension.
+        """
+        if self.variable is not None:
+            return variables[self.variable]
+        return eval(self.code, FORMULA_GLOBALS, variables)
+
+    def solve(self, size: int, variables: dict[str, int]) -> bool:
+        """Bind the only unbound variable of the dimension so that it evaluates to size. Only affine 
+        formulas of this variable (e.g. "(2*c+1)") are solved, nothing is bound otherwise.
+
+        Args:
+            size (int): observed value of the dimension.
+            variables (dict[str, int]): variables values, updated in place.
+
+        Returns:
+            bool: False if the dimension cannot be solved, i.e. it has several unbound variables or is not 
+            affine in its unbound variable (e.g. "(c*c)"). An affine dimension which cannot reach size is solvable.
+        """
+        unbound = [var for var in self.variables if var not in variables]
+        if len(unbound) != 1:
+            return not unbound
+        var = unbound[0]
+        # the formula is affine in var: size = a*var + b
+        try:
+            b = self.evaluate(variables | {var: 0})
+            a = self.evaluate(variables | {var: 1}) - b
+            affine = self.evaluate(variables | {var: 2}) == 2*a + b
+        except ZeroDivisionError:
+            return False
+        if not affine:
+            return False
+        if a != 0 and (size - b) % a == 0 and (size - b) // a > 0:
+            variables[var] = (size - b) // a
+        return True
+
+
+class CompiledVectorFormula:
+    """Vector formula whose dimensions are compiled once.
+    """
+
+    def __init__(self, vector_formula: VectorFormula) -> None:
+        """Initializes compiled vector formula.
+
+        Args:
+            vector_formula (VectorFormula): parsed vector formula.
+        """
+        self.vector_formula = vector_formula.vector_formula
+        self.dims = [CompiledDim(dim) for dim in vector_formula.dims]
+        self.variables = frozenset(vector_formula.variables)
+
+    def __repr__(self) -> str:
+        """Creates string representation of the compiled vector formula.
+
+        Returns:
+            str: string representation of the compiled vector formula.
+        """
+        return f"""Compiled vector formula: "{self.vector_formula}"."""
+
+    def evaluate(self, variables: dict[str, int]) -> list[int]:
+        """Evaluate every dimension of the vector formula.
+
+        Args:
+            variables (dict[str, int]): variables values.
+
+        Returns:
+            list[int]: shape described by the vector formula.
+        """
+        return [dim.evaluate(variables) for dim in self.dims]
+
+    def match(self, shape: Sequence[int], variables: dict[str, int], partial: bool = False) -> None:
+        """Check a shape against the vector formula. Variables seen for the first time are bound to the 
+        observed dimensions, letters first and then affine formulas, and checked against the following 
+        dimensions. This is the unification used both by the checker and by the runtime contracts.
+
+        Args:
+            shape (Sequence[int]): observed shape.
+            variables (dict[str, int]): variables values, updated in place with the new bindings.
+            partial (bool, optional): skip the dimensions which cannot be solved (e.g. "(c*c)"), see 
+            CompiledDim.solve, instead of raising. Defaults to False.
+
+        Raises:
+            DimensionNumberError: error raised if the shape does not have the expected number of dimensions.
+            DimensionError: error raised if a dimension does not match the vector formula.
+        """
+        if len(shape) != len(self.dims):
+            raise DimensionNumberError(self.vector_formula, shape, len(self.dims))
+
+        for dim, size in zip(self.dims, shape):
+            if dim.variable is not None:
+                if dim.variable not in variables:
+                    variables[dim.variable] = size
+                elif variables[dim.variable] != size:
+                    raise DimensionError(self.vector_formula, shape, dim.dim)
+
+        for dim, size in zip(self.dims, shape):
+            if dim.variable is None:
+                if not dim.solve(size, variables) and partial:
+                    continue
+                if not dim.variables <= variables.keys() or dim.evaluate(variables) != size:
+                    raise DimensionError(self.vector_formula, shape, dim.dim)
+
+
+class CompiledPattern:
+    """Pattern parsed and compiled once, ready to be evaluated many times.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        """Initializes compiled pattern.
+
+        Args:
+            pattern (str): pattern string, see Pattern for the format.
+        """
+        parsed = Pattern(pattern)
+        self.pattern = pattern
+        self.in_formulas = [
+            CompiledVectorFormula(vf) for vf in parsed.in_formula.vector_formulas
+        ]
+        self.out_formulas = [
+            CompiledVectorFormula(vf) for vf in parsed.out_formula.vector_formulas
+        ]
+        # distinct dimensions of the inputs and outputs.
+        self.dims = list({
+            dim.dim: dim for vf in self.in_formulas + self.out_formulas for dim in vf.dims
+        }.values())
+        # variables needed to build the inputs, sorted to make sampling reproducible.
+        self.in_variables = tuple(
+            sorted(set().union(*(vf.variables for vf in self.in_formulas))))
+
+    def __repr__(self) -> str:
+        """Creates string representation of the compiled pattern.
+
+        Returns:
+            str: string representation of the compiled pattern.
+        """
+        return f"Compiled pattern: {self.pattern}."
+
+
+@lru_cache(maxsize=512)
+def compile_pattern(pattern: str) -> CompiledPattern:
+    """Compile a pattern string, reusing the result of previous calls. The cache is bounded
+    (least recently used patterns are dropped first) and shared by the whole process. Hits and
+    misses are available with compile_pattern.cache_info() and the cache can be emptied with
+    compile_pattern.cache_clear().
+
+    Args:
+        pattern (str): pattern string.
+
+    Returns:
+        CompiledPattern: compiled pattern.
+    """
+    return CompiledPattern(pattern)
@@ -1,27 +1,102 @@
-from dim_checker.errors.constraint_errors import ConstraintDimError, ConstraintTypeError
+from typing import Optional, Sequence
+import ast
+
+from dim_checker.errors.constraint_errors import ConstraintDimError, ConstraintTypeError, ConstraintRelationError
+from dim_checker.objects.compiled import CompiledDim
+from dim_checker.utils import FORMULA_GLOBALS, parse_relation
+
+
+def _dependencies(names: set[str], derived: dict[str, CompiledDim]) -> set[str]:
+    """Variables an expression depends on, directly or through derived variables.
+
+    Args:
+        names (set[str]): variables of the expression.
+        derived (dict[str, CompiledDim]): expressions of the derived variables.
+
+    Returns:
+        set[str]: all the variables the expression depends on.
+    """
+    names = set(names)
+    pending = list(names)
+    while pending:
+        var = pending.pop()
+        if var in derived:
+            for dependency in derived[var].variables - names:
+                names.add(dependency)
+                pending.append(dependency)
+    return names
+
+
+class Relation:
+    """Relation between variables compiled once, e.g. "h % 8 == 0", "4 <= l <= 64" or "h <= w".
+    """
+
+    __slots__ = ("relation", "code", "variables", "bound")
+
+    def __init__(self, relation: str, tree: ast.Expression) -> None:
+        """Initializes relation.
+
+        Args:
+            relation (str): relation.
+            tree (ast.Expression): syntax tree of the relation, see parse_relation.
+        """
+        self.relation = relation
+        self.code = compile(tree, filename='', mode='eval')
+        self.variables = frozenset(self.code.co_names)
+        # largest constant of the relation, e.g. 64 for "4 <= l <= 64"
+        self.bound = max([int(abs(node.value)) for node in ast.walk(tree)
+                          if isinstance(node, ast.Constant) and isinstance(node.value, (int, float))], default=0)
+
+    def __repr__(self) -> str:
+        """Creates string representation of the relation.
+
+        Returns:
+            str: string representation of the relation.
+        """
+        return f"""Relation: "{self.relation}"."""
+
+    def holds(self, variables: dict[str, int]) -> bool:
+        """Check the relation for the variables values.
+
+        Args:
+            variables (dict[str, int]): variables values.
+
+        Returns:
+            bool: True if the relation holds.
+        """
+        try:
+            return bool(eval(self.code, FORMULA_GLOBALS, variables))
+        except ZeroDivisionError:
+            return False
 
 
 class Constraints:
 
-    def __init__(self, constraints: dict) -> None:
+    def __init__(self, constraints: dict, relations: Sequence[str] = ()) -> None:
         """Initialize constraints.
 
         Args:
             constraints (dict): dimensions constraints.
+            relations (Sequence[str], optional): relations between dimensions, e.g. "h % 8 == 0",
+            "4 <= l <= 64" or "n == 2*c". Defaults to ().
         """
         self.constraints = self.parse_constraints(constraints)
+        # relations as given, e.g. to send them to other processes
+        self.relation_strings = tuple(relations)
+        self.derived, self.relations = self.parse_relations(relations)
+        self.__tables = {}
 
     def parse_constraints(self, constraints: dict) -> dict:
         """Parse the constraints and check there validity.
 
         Args:
-            constraints (dict): dictionary of constraints on 
+            constraints (dict): dictionary of constraints on
             dimensions.
 
         Raises:
-            ConstraintDimError: error raised when the constant dimension format 
+            ConstraintDimError: error raised when the constant dimension format
             is not respected.
-            ConstraintTypeError: error raised when the constant value type is not 
+            ConstraintTypeError: error raised when the constant value type is not
             correct.
 
         Returns:
@@ -31,10 +106,106 @@ class Constraints:
         for dim in constraints.keys():
             value = constraints[dim]
             if len(dim) > 1 or (not dim.isalpha()):
-                raise ConstraintDimError(dim) 
-            
+                raise ConstraintDimError(dim)
+
             if not isinstance(value, int) :
                 raise ConstraintTypeError(dim, value)
 
         return constraints
 
+    def parse_relations(self, relations: Sequence[str]) -> tuple[dict[str, CompiledDim], list[Relation]]:
+        """Parse the relations. Equalities tying a variable to an expression of other variables
+        (e.g. "n == 2*c") define derived variables, computed from the other variables instead of being
+        drawn. The other relations filter the variables values.
+
+        Args:
+            relations (Sequence[str]): relations between dimensions.
+
+        Raises:
+            ConstraintRelationError: error raised when a relation is not a valid comparison.
+
+        Returns:
+            tuple[dict[str, CompiledDim], list[Relation]]: expressions of the derived variables and relations.
+        """
+        derived, parsed = {}, []
+        for relation in relations:
+            try:
+                tree = parse_relation(relation)
+            except ValueError:
+                raise ConstraintRelationError(relation) from None
+
+            compare = tree.body
+            if isinstance(compare, ast.Compare) and len(compare.ops) == 1 and isinstance(compare.ops[0], ast.Eq):
+                for var, expr in [(compare.left, compare.comparators[0]), (compare.comparators[0], compare.left)]:
+                    # variables the expression depends on, through the derived variables, to avoid cycles
+                    names = _dependencies({node.id for node in ast.walk(expr) if isinstance(node, ast.Name)}, derived)
+                    if isinstance(var, ast.Name) and var.id not in names | derived.keys() | self.constraints.keys():
+                        derived[var.id] = CompiledDim(f"({ast.unparse(expr)})")
+                        break
+                else:
+                    parsed.append(Relation(relation, tree))
+                continue
+            parsed.append(Relation(relation, tree))
+        return derived, parsed
+
+    def tables(self, variables: Sequence[str], values: Sequence[int], max_size: int) -> dict[str, list[int]]:
+        """Candidate values of each variable: the values satisfying the relations over this variable only
+        (e.g. "h % 8 == 0"). If none of the given values does, all the integers from 2 to max_size (or the
+        largest constant of the relations) are considered. The tables are solved once and reused.
+
+        Args:
+            variables (Sequence[str]): variables drawn by the size selector.
+            values (Sequence[int]): default candidate values, e.g. primes.
+            max_size (int): maximum value of a variable.
+
+        Raises:
+            ValueError: error raised if no value satisfies the relations over a variable.
+
+        Returns:
+            dict[str, list[int]]: candidate values of each variable, in increasing order.
+        """
+        key = (tuple(variables), tuple(values), max_size)
+        if key not in self.__tables:
+            tables = {}
+            for var in variables:
+                relations = [r for r in self.relations if r.variables == {var}]
+                table = [v for v in values if all(r.holds({var: v}) for r in relations)]
+                if not table:
+                    limit = max([max_size - 1] + [r.bound for r in relations])
+                    table = [v for v in range(2, limit + 1) if all(r.holds({var: v}) for r in relations)]
+                if not table:
+                    raise ValueError(f"No value of {var} satisfies the relations {[r.relation for r in relations]}.")
+                tables[var] = table
+            self.__tables[key] = tables
+        return self.__tables[key]
+
+    def derive(self, variables: dict[str, int]) -> Optional[dict[str, int]]:
+        """Compute the derived variables and check the relations.
+
+        Args:
+            variables (dict[str, int]): values of the drawn and constrained variables.
+
+        Returns:
+            Optional[dict[str, int]]: values of all the variables, None if a derived variable is not a positive
+            integer or if a relation does not hold.
+        """
+        variables = dict(variables)
+        pending = dict(self.derived)
+        # derived variables may depend on each other, they are computed when their variables are known
+        while pending:
+            ready = [var for var, dim in pending.items() if dim.variables <= variables.keys()]
+            if not ready:
+                break
+            for var in ready:
+                try:
+                    value = pending.pop(var).evaluate(variables)
+                except ZeroDivisionError:
+                    return None
+                if value != int(value) or value <= 0:
+                    return None
+                variables[var] = int(value)
+
+        # relations over variables which are not known yet (e.g. output variables) are not checked
+        if all(r.holds(variables) for r in self.relations if r.variables <= variables.keys()):
+            return variables
+        return None
@@ -0,0 +1,293 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class PhaseReport:
+    """Wall time and peak memory of a phase of a test.
+    """
+
+    def __init__(self, name: str, seconds: float, peak_memory: Optional[int], pattern: str, seed: int = None) -> None:
+        """Initializes phase report.
+
+        Args:
+            name (str): name of the phase: "parse", "inputs", "forward" or "check".
+            seconds (float): wall time of the phase.
+            peak_memory (Optional[int]): peak memory allocated during the phase, in bytes, None if the memory 
+            of the phase was not traced (torch tensors on the cpu).
+            pattern (str): tested pattern.
+            seed (int, optional): seed of the trial, None for phases outside of trials. Defaults to None.
+        """
+        self.name = name
+        self.seconds = seconds
+        self.peak_memory = peak_memory
+        self.pattern = pattern
+        self.seed = seed
+
+    def __repr__(self) -> str:
+        """Creates string representation of the phase report.
+
+        Returns:
+            str: string representation of the phase report.
+        """
+        memory = "untraced memory" if self.peak_memory is None else f"{self.peak_memory} bytes"
+        return f"Phase {self.name}: {self.seconds * 1e3:.3f}ms, {memory}."
+
+
+class TrialReport:
+    """Summary of a single test run with fixed variables values.
+    """
+
+    def __init__(self, variables: dict[str, int], eval_mode: str, seed: int,
+                 guards: list[str] = None, collisions: list[tuple[str, str]] = None,
+                 phases: list[PhaseReport] = None, compiles: int = 0) -> None:
+        """Initializes trial report.
+
+        Args:
+            variables (dict[str, int]): variables values used for the trial.
+            eval_mode (str): how the callable was evaluated, either "real", "meta" or "symbolic".
+            seed (int): seed of the random generator used to draw the variables values.
+            guards (list[str], optional): for symbolic trials, conditions on the variables under which 
+            the output shapes are proved correct. Defaults to None.
+            collisions (list[tuple[str, str]], optional): pairs of distinct dimensions of the pattern which 
+            took the same value, and thus could not be told apart. Defaults to None.
+            phases (list[PhaseReport], optional): wall time and peak memory of the phases of the trial, 
+            when profiling. Defaults to None.
+            compiles (int, optional): number of frames compiled by torch.compile during the trial. Defaults to 0.
+        """
+        self.variables = variables
+        self.eval_mode = eval_mode
+        self.seed = seed
+        self.guards = guards
+        self.collisions = collisions or []
+        self.phases = phases or []
+        self.compiles = compiles
+
+    def __repr__(self) -> str:
+        """Creates string representation of the trial report.
+
+        Returns:
+            str: string representation of the trial report.
+        """
+        if self.eval_mode == "symbolic":
+            return f"Symbolic trial proved under guards {self.guards}."
+        s = f"Trial ({self.eval_mode}, seed {self.seed}) with variables {self.variables}"
+        if self.collisions:
+            s += f" and collisions {self.collisions}"
+        return s + "."
+
+
+class CheckReport:
+    """Summary of all the trials run by DimChecker.test_dims.
+    """
+
+    def __init__(self, pattern: str, constraints: dict) -> None:
+        """Initializes check report.
+
+        Args:
+            pattern (str): tested pattern.
+            constraints (dict): constraints over the dimensions.
+        """
+        self.pattern = pattern
+        self.constraints = constraints
+        self.trials = []
+        # phases outside of the trials, e.g. parsing
+        self.phases = []
+        # the test passed before and was skipped, see ResultCache
+        self.cached = False
+
+    def __repr__(self) -> str:
+        """Creates string representation of the check report.
+
+        Returns:
+            str: string representation of the check report.
+        """
+        if self.cached:
+            return f"Check of pattern {self.pattern} passed before (cached)."
+        s = f"Check of pattern {self.pattern} with {len(self.trials)} trial(s): "
+        for trial in self.trials:
+            s += f"\n -> {str(trial)}"
+        return s
+
+    @property
+    def eval_mode(self) -> str:
+        """Evaluation mode used for the trials.
+
+        Returns:
+            str: "real", "meta" or "symbolic" if all the trials used the same mode, "mixed" otherwise.
+        """
+        modes = {trial.eval_mode for trial in self.trials}
+        return modes.pop() if len(modes) == 1 else "mixed"
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """Total wall time of each phase over the test, when profiling.
+
+        Returns:
+            dict[str, float]: wall time in seconds of each phase.
+        """
+        timings = {}
+        for phase in self.phases + [phase for trial in self.trials for phase in trial.phases]:
+            timings[phase.name] = timings.get(phase.name, 0.) + phase.seconds
+        return timings
+
+    @property
+    def collision_free(self) -> bool:
+        """Whether every trial gave distinct values to all the dimensions of the pattern, in which case 
+        any output dimension replaced by another dimension of the pattern is detected.
+
+        Returns:
+            bool: True if no trial had collisions.
+        """
+        return not any(trial.collisions for trial in self.trials)
+
+    @property
+    def compiles(self) -> int:
+        """Number of frames compiled by torch.compile during the trials. With compile_mode "dynamic" or 
+        "fixed" a compiled callable is only recompiled for the first trials.
+
+        Returns:
+            int: number of compilations.
+        """
+        return sum(trial.compiles for trial in self.trials)
+
+    @property
+    def proved(self) -> bool:
+        """Whether the output shapes were proved by a symbolic trace rather than sampled.
+
+        Returns:
+            bool: True if a symbolic trial succeeded.
+        """
+        return any(trial.eval_mode == "symbolic" for trial in self.trials)
+
+
+class CaseReport:
+    """Result of one of the tests run by DimChecker.test_many.
+    """
+
+    def __init__(self, index: int, pattern: str, constraints: dict, cost: int,
+                 report: CheckReport, error: Exception) -> None:
+        """Initializes case report.
+
+        Args:
+            index (int): position of the test in the cases.
+            pattern (str): tested pattern.
+            constraints (dict): constraints over the dimensions.
+            cost (int): estimated cost used to schedule the test.
+            report (CheckReport): report of the test, None if the test failed.
+            error (Exception): error raised by the test, None if the test passed.
+        """
+        self.index = index
+        self.pattern = pattern
+        self.constraints = constraints
+        self.cost = cost
+        self.report = report
+        self.error = error
+
+    def __repr__(self) -> str:
+        """Creates string representation of the case report.
+
+        Returns:
+            str: string representation of the case report.
+        """
+        status = "passed" if self.passed else f"failed ({type(self.error).__name__}: {self.error})"
+        return f"Case {self.index} with pattern {self.pattern} {status}."
+
+    @property
+    def passed(self) -> bool:
+        """Whether the test passed.
+
+        Returns:
+            bool: True if no error was raised.
+        """
+        return self.error is None
+
+
+class BatchReport:
+    """Results of all the tests run by DimChecker.test_many.
+    """
+
+    def __init__(self, cases: list[CaseReport]) -> None:
+        """Initializes batch report.
+
+        Args:
+            cases (list[CaseReport]): reports of the tests.
+        """
+        self.cases = cases
+
+    def __repr__(self) -> str:
+        """Creates string representation of the batch report.
+
+        Returns:
+            str: string representation of the batch report.
+        """
+        s = f"{len(self.cases) - len(self.failures)}/{len(self.cases)} case(s) passed: "
+        for case in self.cases:
+            s += f"\n -> {str(case)}"
+        return s
+
+    @property
+    def passed(self) -> bool:
+        """Whether all the tests passed.
+
+        Returns:
+            bool: True if no test failed.
+        """
+        return not self.failures
+
+    @property
+    def failures(self) -> list[CaseReport]:
+        """Reports of the failing tests.
+
+        Returns:
+            list[CaseReport]: failing tests reports.
+        """
+        return [case for case in self.cases if not case.passed]
+
+
+class ValidationReport:
+    """Results of the validation of logged shapes against a pattern, see validate_shapes.
+    """
+
+    def __init__(self, pattern: str, mask: "np.ndarray", violations: dict[str, int]) -> None:
+        """Initializes validation report.
+
+        Args:
+            pattern (str): validated pattern.
+            mask (np.ndarray): boolean array, True for the records matching the pattern.
+            violations (dict[str, int]): number of records violating each dimension of the pattern.
+        """
+        self.pattern = pattern
+        self.mask = mask
+        self.violations = violations
+
+    def __repr__(self) -> str:
+        """Creates string representation of the validation report.
+
+        Returns:
+            str: string representation of the validation report.
+        """
+        s = f"Validation of pattern {self.pattern}: {len(self.mask) - self.nb_invalid}/{len(self.mask)} record(s) valid."
+        for dim, count in self.violations.items():
+            if count:
+                s += f"\n -> dimension {dim} violated by {count} record(s)"
+        return s
+
+    @property
+    def passed(self) -> bool:
+        """Whether all the records match the pattern.
+
+        Returns:
+            bool: True if no record is invalid.
+        """
+        return self.nb_invalid == 0
+
+    @property
+    def nb_invalid(self) -> int:
+        """Number of records not matching the pattern.
+
+        Returns:
+            int: number of invalid records.
+        """
+        return int(len(self.mask) - self.mask.sum())
@@ -1,52 +1,150 @@
-import torch
-import numpy as np
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Callable
+import math
+
+from dim_checker.objects.backends import get_backend
+
+# array libraries are imported by the backends when the first vector of their type is created.
+if TYPE_CHECKING:
+    import torch
+    import numpy as np
+
+
+class InputPool:
+    """Pool of input vectors reused across trials and tests, bounded in bytes. The least recently
+    used vectors are evicted first. Pooled vectors are shared, hence tested callables must not
+    modify their inputs in place.
+    """
+
+    def __init__(self, max_bytes: int = 2**28) -> None:
+        """Initializes input pool.
+
+        Args:
+            max_bytes (int, optional): maximum number of bytes held by the pool. Defaults to 256MB.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__vectors = OrderedDict()
+        self.__lock = Lock()
+
+    def __repr__(self) -> str:
+        """Creates string representation of the input pool.
+
+        Returns:
+            str: string representation of the input pool.
+        """
+        return f"Input pool of {len(self.__vectors)} vector(s) ({self.nbytes}/{self.max_bytes} bytes)."
+
+    def __getstate__(self) -> dict:
+        """Pools are sent empty to other processes.
+
+        Returns:
+            dict: state of an empty pool with the same capacity.
+        """
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore an empty pool.
+
+        Args:
+            state (dict): state of the pool.
+        """
+        self.__init__(state["max_bytes"])
+
+    def get(self, key: tuple, factory: Callable, nbytes: int):
+        """Get the vector stored under key, or create it and store it.
+
+        Args:
+            key (tuple): key of the vector, e.g. (eval_type, shape, dtype, device, eval_value).
+            factory (Callable): function creating the vector.
+            nbytes (int): size of the vector in bytes.
+
+        Returns:
+            torch.Tensor or np.ndarray: pooled vector.
+        """
+        with self.__lock:
+            if key in self.__vectors:
+                self.hits += 1
+                self.__vectors.move_to_end(key)
+                return self.__vectors[key][0]
+            self.misses += 1
+
+        vector = factory()
+        # vectors larger than the pool are not stored
+        if nbytes > self.max_bytes:
+            return vector
+
+        with self.__lock:
+            self.__vectors[key] = (vector, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self.__vectors.popitem(last=False)
+                self.nbytes -= evicted
+        return vector
+
+    def clear(self) -> None:
+        """Remove all the vectors from the pool.
+        """
+        with self.__lock:
+            self.__vectors.clear()
+            self.nbytes = 0
 
 
 class Vector:
 
-    def __init__(self, shape: list[int], eval_value: str or int, eval_type: str, device: torch.device) -> None:
+    def __init__(self, shape: list[int], eval_value: str or int, eval_type: str, device: "torch.device" = None,
+                 pool: InputPool = None, dtype: str = None) -> None:
         self.shape = shape
         self.eval_value = eval_value
         self.eval_type = eval_type
         self.device = device
-        
+        self.pool = pool
+        self.dtype = dtype
+        self.backend = get_backend(eval_type)
 
-    @property
-    def eval_vector(self) -> torch.Tensor or np.ndarray:
 
-        if self.eval_type not in ["torch", "numpy"]:
-            raise ValueError(
-                f"Evaluation type must be either torch or numpy, got {self.eval_type}.")
+    @property
+    def eval_vector(self) -> "torch.Tensor or np.ndarray":
 
         if self.eval_value == "random":
-            if self.eval_type == "torch":
-                return torch.randn(self.shape, device=self.device)
-            else:
-                return np.random.randn(self.shape)
+            # random vectors are the only ones worth pooling, constant vectors are cheap to fill
+            if self.pool is None or str(self.device) == "meta":
+                return self.random_vector()
+            key = (self.eval_type, tuple(self.shape), self.dtype, str(self.device), self.eval_value)
+            nbytes = self.backend.itemsize(self.dtype) * math.prod(self.shape)
+            return self.pool.get(key, self.random_vector, nbytes)
 
         elif self.eval_value == "zeros":
-            if self.eval_type == "torch":
-                return torch.zeros(self.shape, device=self.device)
-            else:
-                return np.zeros((self.shape))
+            return self.constant_vector(0.)
         elif self.eval_value == "ones":
-            if self.eval_type == "torch":
-                return torch.ones(self.shape, device=self.device)
-            else:
-                return np.ones((self.shape))
+            return self.constant_vector(1.)
 
         elif type(self.eval_value) in [int, float]:
-            if self.eval_type == "torch":
-                return self.eval_value * torch.ones(self.shape, device=self.device)
-            else:
-                return self.eval_value * np.ones((self.shape))
+            return self.constant_vector(float(self.eval_value))
 
         else:
             raise ValueError(
                 f"Error with eval_value = {self.eval_value}, must be either 'random', 'zeros', 'ones', or particular float."
             )
 
+    def random_vector(self) -> "torch.Tensor or np.ndarray":
+        """Create a random vector, normally distributed for floating dtypes.
 
+        Returns:
+            torch.Tensor or np.ndarray: random vector.
+        """
+        return self.backend.random(self.shape, self.dtype, self.device)
 
+    def constant_vector(self, value: float) -> "torch.Tensor or np.ndarray":
+        """Create a constant vector, writable so that in place callables (e.g. ReLU(inplace=True)) can be tested.
 
+        Args:
+            value (float): value of all the elements.
 
+        Returns:
+            torch.Tensor or np.ndarray: constant vector.
+        """
+        return self.backend.full(self.shape, value, self.dtype, self.device)
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, Union
+import threading
+import time
+import tracemalloc
+
+from dim_checker.objects import PhaseReport
+
+if TYPE_CHECKING:
+    import torch
+
+
+# number of active tracing contexts and whether tracemalloc was started by them, see tracing.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+@contextmanager
+def tracing() -> Iterator[None]:
+    """Trace the memory with tracemalloc during the context. The contexts are reference counted, so that 
+    concurrent tests (e.g. test_many threads) do not stop the tracing of each other, and tracemalloc is 
+    stopped by the last one only if it was not tracing before the first one.
+
+    Yields:
+        Iterator[None]: context of the tracing.
+    """
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+    try:
+        yield
+    finally:
+        with _tracing_lock:
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
+
+
+@contextmanager
+def measure_phase(name: str, phases: list[PhaseReport], pattern: str, seed: int = None,
+                  hook: Callable = None, device: Union[str, "torch.device"] = None, traced: bool = True) -> Iterator[None]:
+    """Measure the wall time and the peak memory of a phase of a test. The memory allocated by Python 
+    and numpy is traced with tracemalloc, the memory of cuda devices with the torch allocator stats. 
+    Tensors on the cpu are not traced, the peak memory of phases allocating them is None. Peaks are 
+    shared by all the threads of the process.
+
+    Args:
+        name (str): name of the phase, e.g. "parse", "inputs", "forward" or "check".
+        phases (list[PhaseReport]): reports of the phases, the report of this phase is appended.
+        pattern (str): tested pattern.
+        seed (int, optional): seed of the trial, None for phases outside of trials. Defaults to None.
+        hook (Callable, optional): function called with the report of the phase. Defaults to None.
+        device (Union[str, torch.device], optional): device of the inputs, e.g. "cuda:0". Defaults to None.
+        traced (bool, optional): whether the memory of the phase is visible to tracemalloc or the cuda stats, 
+        e.g. False for torch tensors on the cpu. Defaults to True.
+
+    Yields:
+        Iterator[None]: context of the phase.
+    """
+    if device is not None:
+        import torch
+        device = torch.device(device)
+    cuda = device is not None and device.type == "cuda"
+    with tracing():
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        if cuda:
+            import torch
+            torch.cuda.reset_peak_memory_stats(device)
+            start_memory += torch.cuda.memory_allocated(device)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_memory = None
+            if traced:
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                if cuda:
+                    peak_memory += torch.cuda.max_memory_allocated(device)
+                peak_memory = max(0, peak_memory - start_memory)
+            record = PhaseReport(name, seconds, peak_memory, pattern, seed)
+            phases.append(record)
+            if hook is not None:
+                hook(record)
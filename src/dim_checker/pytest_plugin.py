@@ -0,0 +1,182 @@
+"""pytest plugin of dim-checker, registered with the pytest11 entry point.
+
+    @pytest.mark.dims("bcl->bcn", n=1)
+    def test_sum(check_dims):
+        check_dims(SumLastDim())
+
+The session-scoped dim_checker fixture is shared by all the tests, the checks it runs are timed and the
+slowest ones are listed in the terminal summary. With pytest-xdist and --dist loadgroup, the tests marked
+with dims are spread over the workers by estimated cost.
+"""
+from typing import Callable, Optional
+import os
+import time
+
+import pytest
+
+from dim_checker.dim_check import DimChecker
+from dim_checker.objects import CheckReport, compile_pattern
+
+
+class SessionDimChecker(DimChecker):
+    """DimChecker shared by the tests of a session, recording the duration and number of trials of each
+    check in the properties of the running test.
+    """
+
+    def __init__(self, plugin: "DimsPlugin", **kwargs) -> None:
+        """Initializes session checker.
+
+        Args:
+            plugin (DimsPlugin): plugin tracking the running test.
+            kwargs: options of DimChecker.
+        """
+        super().__init__(**kwargs)
+        self.plugin = plugin
+
+    def test_dims(self, function: Callable, pattern: str, *relations: str, **constraints) -> CheckReport:
+        """See DimChecker.test_dims."""
+        start = time.perf_counter()
+        trials = 0
+        try:
+            report = super().test_dims(function, pattern, *relations, **constraints)
+            trials = len(report.trials)
+            return report
+        finally:
+            if self.plugin.item is not None:
+                seconds = time.perf_counter() - start
+                self.plugin.item.user_properties.append(("dim_check", (pattern, seconds, trials)))
+
+
+class DimsPlugin:
+    """Hooks of the plugin: running test tracking, xdist groups and terminal summary.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """Initializes plugin.
+
+        Args:
+            config (pytest.Config): pytest configuration.
+        """
+        self.config = config
+        self.item = None
+        # (test id, pattern, seconds, trials) of each check
+        self.checks = []
+
+    def checker_options(self) -> dict:
+        """Options of the session checker, from the ini file.
+
+        Returns:
+            dict: options of DimChecker.
+        """
+        return {
+            "depth": int(self.config.getini("dims_depth")),
+            "max_size": int(self.config.getini("dims_max_size")),
+            "eval_mode": self.config.getini("dims_eval_mode"),
+        }
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        self.item = item
+        try:
+            yield
+        finally:
+            self.item = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config: pytest.Config, items: list[pytest.Item]) -> None:
+        """Spread the tests marked with dims over the xdist workers by estimated cost: the most expensive
+        test goes to the least loaded group. Must run before xdist adds the groups to the test ids.
+        """
+        workers = self.workers()
+        if workers is None:
+            return
+        checker = DimChecker(**self.checker_options())
+        costs = {}
+        for item in items:
+            marker = item.get_closest_marker("dims")
+            if marker is not None and marker.args and item.get_closest_marker("xdist_group") is None:
+                try:
+                    costs[item] = checker.estimate_cost(marker.args[0], marker.kwargs)
+                except Exception:
+                    # invalid pattern, the error is reported when running the test
+                    costs[item] = 0
+
+        loads = [0] * workers
+        for item in sorted(costs, key=lambda item: (-costs[item], item.nodeid)):
+            group = loads.index(min(loads))
+            loads[group] += costs[item]
+            item.add_marker(pytest.mark.xdist_group(f"dims{group}"))
+
+    def workers(self) -> Optional[int]:
+        """Number of xdist workers, None if the tests are not distributed.
+
+        Returns:
+            Optional[int]: number of workers.
+        """
+        workerinput = getattr(self.config, "workerinput", None)
+        if workerinput is not None:
+            return workerinput["workercount"]
+        if not self.config.pluginmanager.hasplugin("xdist"):
+            return None
+        workers = self.config.getoption("numprocesses", None)
+        if workers == "auto" or workers == "logical":
+            return os.cpu_count()
+        return workers or None
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        # checks of xdist workers reach the controller through the reports properties
+        if report.when == "call":
+            for name, value in report.user_properties:
+                if name == "dim_check":
+                    self.checks.append((report.nodeid, *value))
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.checks or hasattr(self.config, "workerinput"):
+            return
+        number = self.config.getoption("dims_slowest")
+        terminalreporter.section(f"slowest {min(number, len(self.checks))} dim checks")
+        for nodeid, pattern, seconds, trials in sorted(self.checks, key=lambda check: -check[2])[:number]:
+            terminalreporter.write_line(f"{seconds:8.3f}s {trials:3d} trial(s)  {pattern:<30} {nodeid}")
+        info = compile_pattern.cache_info()
+        terminalreporter.write_line(
+            f"{len(self.checks)} check(s) in {sum(check[2] for check in self.checks):.3f}s, "
+            f"patterns parsed {info.misses} time(s), reused {info.hits} time(s)."
+        )
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("dim_checker")
+    group.addoption("--dims-slowest", dest="dims_slowest", type=int, default=10,
+                    help="number of slowest dim checks shown in the terminal summary (default: 10).")
+    parser.addini("dims_depth", "depth of the session dim checker.", default="1")
+    parser.addini("dims_max_size", "max_size of the session dim checker.", default="100")
+    parser.addini("dims_eval_mode", "eval_mode of the session dim checker.", default="real")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "dims(pattern, *relations, **constraints): pattern checked by the check_dims fixture."
+    )
+    config.pluginmanager.register(DimsPlugin(config), "dim_checker_plugin")
+
+
+@pytest.fixture(scope="session")
+def dim_checker(pytestconfig: pytest.Config) -> DimChecker:
+    """DimChecker shared by all the tests of the session. Patterns are parsed once and reused by all
+    the checks (see compile_pattern).
+    """
+    plugin = pytestconfig.pluginmanager.get_plugin("dim_checker_plugin")
+    return SessionDimChecker(plugin, **plugin.checker_options())
+
+
+@pytest.fixture
+def check_dims(request: pytest.FixtureRequest, dim_checker: DimChecker) -> Callable[[Callable], CheckReport]:
+    """Check a callable against the pattern, relations and constraints of the dims marker of the test.
+    """
+    marker = request.node.get_closest_marker("dims")
+    if marker is None or not marker.args:
+        pytest.fail("check_dims requires a dims marker, e.g. @pytest.mark.dims(\"bcl->bcn\", n=1).")
+
+    def check(function: Callable) -> CheckReport:
+        return dim_checker.test_dims(function, *marker.args, **marker.kwargs)
+    return check
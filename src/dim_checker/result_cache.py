@@ -0,0 +1,403 @@
+from contextlib import closing, contextmanager
+from typing import Callable, Iterator, Optional, Sequence
+import functools
+import hashlib
+import inspect
+import numbers
+import sqlite3
+import sysconfig
+import time
+import types
+
+# installed packages and the standard library, whose functions are not followed by the fingerprints.
+_LIBRARY_PATHS = tuple({sysconfig.get_paths()[name] for name in ["stdlib", "purelib", "platlib"]})
+
+
+def _code_digest(code: types.CodeType, digest: "hashlib._Hash") -> None:
+    """Update a digest with a code object, including the nested code objects (e.g. inner functions).
+
+    Args:
+        code (types.CodeType): code object.
+        digest (hashlib._Hash): digest to update.
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _source_digest(obj, digest: "hashlib._Hash") -> None:
+    """Update a digest with the source code of an object, or its bytecode if the source is not available.
+
+    Args:
+        obj: function, method or class.
+        digest (hashlib._Hash): digest to update.
+    """
+    try:
+        digest.update(inspect.getsource(obj).encode())
+    except (OSError, TypeError):
+        code = getattr(obj, "__code__", None)
+        if code is not None:
+            _code_digest(code, digest)
+        else:
+            digest.update(getattr(obj, "__qualname__", repr(type(obj))).encode())
+
+
+def _names(code: types.CodeType) -> set[str]:
+    """Global names referenced by a code object and its nested code objects.
+
+    Args:
+        code (types.CodeType): code object.
+
+    Returns:
+        set[str]: referenced names.
+    """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+
+def _is_library(obj) -> bool:
+    """Check if a function or class comes from an installed package, the standard library or the builtins.
+    Their code only changes with the package versions.
+
+    Args:
+        obj: function or class.
+
+    Returns:
+        bool: True if the object is not user code.
+    """
+    code = getattr(obj, "__code__", None)
+    try:
+        filename = code.co_filename if code is not None else inspect.getfile(obj)
+    except (OSError, TypeError):
+        # builtin classes
+        return True
+    return filename.startswith(_LIBRARY_PATHS)
+
+
+def _helpers_digest(obj, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with the source of the functions and classes an object references through its
+    globals (e.g. a helper called by a function or by the forward of a module), recursively. Functions of
+    installed packages and of the standard library are not followed.
+
+    Args:
+        obj: function or class.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+    """
+    functions = [obj] if inspect.isfunction(obj) else [
+        f for f in vars(obj).values() if inspect.isfunction(f)
+    ] if inspect.isclass(obj) else []
+    for function in functions:
+        for name in sorted(_names(function.__code__)):
+            helper = function.__globals__.get(name)
+            if not (inspect.isfunction(helper) or inspect.isclass(helper)) or id(helper) in seen:
+                continue
+            seen.add(id(helper))
+            if _is_library(helper):
+                continue
+            _source_digest(helper, digest)
+            _helpers_digest(helper, digest, seen)
+
+
+class _Unreliable(Exception):
+    """Raised when a value a callable depends on cannot be fingerprinted reliably."""
+
+
+# values fingerprinted by their representation, numbers include the numpy scalars.
+_PRIMITIVES = (type(None), bool, numbers.Number, str, bytes)
+
+
+def _module_digest(module, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with a nn module: the code of every submodule type, the architecture (representation 
+    of the module) and the shapes and dtypes of the parameters and buffers.
+
+    Args:
+        module (torch.nn.Module): nn module.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+    """
+    # types of the submodules, e.g. custom layers inside a nn.Sequential
+    for cls in dict.fromkeys(type(submodule) for submodule in module.modules()):
+        _class_digest(cls, digest, seen)
+    digest.update(repr(module).encode())
+    for name, t in [*module.named_parameters(), *module.named_buffers()]:
+        digest.update(f"{name}:{tuple(t.shape)}:{t.dtype}".encode())
+
+
+def _class_digest(cls: type, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with the code of a class and of its helpers, or its name for library classes.
+
+    Args:
+        cls (type): class.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+    """
+    if id(cls) in seen:
+        return
+    seen.add(id(cls))
+    if _is_library(cls):
+        digest.update(f"{cls.__module__}.{cls.__qualname__}".encode())
+        return
+    _source_digest(cls, digest)
+    _helpers_digest(cls, digest, seen)
+
+
+def _object_digest(obj, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with an object: the code of its class and its instance attributes. Objects of library 
+    classes are only fingerprinted by their representation when it does not depend on their address.
+
+    Args:
+        obj: object.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+
+    Raises:
+        _Unreliable: error raised if the state of the object is hidden.
+    """
+    cls = type(obj)
+    if _is_library(cls):
+        representation = repr(obj)
+        if hasattr(obj, "__dict__") or " at 0x" in representation:
+            raise _Unreliable(representation)
+        digest.update(f"{cls.__module__}.{cls.__qualname__}:{representation}".encode())
+        return
+    if not hasattr(obj, "__dict__"):
+        raise _Unreliable(repr(obj))
+    _class_digest(cls, digest, seen)
+    _value_digest(vars(obj), digest, seen)
+
+
+def _value_digest(value, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with a value captured by a callable, e.g. a closure cell, a default argument, a partial
+    argument or an instance attribute. Tensors and arrays are fingerprinted by their shape and dtype, like the 
+    parameters of nn modules.
+
+    Args:
+        value: captured value.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+
+    Raises:
+        _Unreliable: error raised if the value cannot be fingerprinted reliably.
+    """
+    if isinstance(value, _PRIMITIVES):
+        digest.update(f"{type(value).__name__}:{value!r}".encode())
+        return
+    if id(value) in seen:
+        digest.update(b"<seen>")
+        return
+    seen.add(id(value))
+    if isinstance(value, (tuple, list)):
+        digest.update(f"{type(value).__name__}:{len(value)}".encode())
+        for item in value:
+            _value_digest(item, digest, seen)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}".encode())
+        for key, item in value.items():
+            _value_digest(key, digest, seen)
+            _value_digest(item, digest, seen)
+    elif isinstance(value, types.ModuleType):
+        digest.update(f"module:{value.__name__}".encode())
+    elif hasattr(value, "shape") and hasattr(value, "dtype") and not callable(value):
+        digest.update(f"{type(value).__qualname__}:{tuple(value.shape)}:{value.dtype}".encode())
+    elif inspect.isclass(value):
+        _class_digest(value, digest, seen)
+    elif callable(value):
+        _callable_digest(value, digest, seen)
+    else:
+        _object_digest(value, digest, seen)
+
+
+def _callable_digest(function: Callable, digest: "hashlib._Hash", seen: set) -> None:
+    """Update a digest with a callable: its code and the code of the helpers it calls (see _helpers_digest), 
+    and the values it captures (partial arguments, closure cells, default arguments, bound instance and 
+    attributes of callable objects).
+
+    Args:
+        function (Callable): function, partial, method, callable object or nn module.
+        digest (hashlib._Hash): digest to update.
+        seen (set): ids of the objects already in the digest, updated in place.
+
+    Raises:
+        _Unreliable: error raised if a captured value cannot be fingerprinted reliably.
+    """
+    if isinstance(function, functools.partial):
+        digest.update(b"partial")
+        _value_digest(function.func, digest, seen)
+        _value_digest(function.args, digest, seen)
+        _value_digest(function.keywords, digest, seen)
+    elif inspect.ismethod(function):
+        _callable_digest(function.__func__, digest, seen)
+        _value_digest(function.__self__, digest, seen)
+    elif inspect.isfunction(function):
+        if _is_library(function):
+            digest.update(f"{function.__module__}.{function.__qualname__}".encode())
+            return
+        _source_digest(function, digest)
+        _code_digest(function.__code__, digest)
+        _helpers_digest(function, digest, seen)
+        _value_digest(function.__defaults__, digest, seen)
+        _value_digest(function.__kwdefaults__, digest, seen)
+        for cell in function.__closure__ or ():
+            try:
+                _value_digest(cell.cell_contents, digest, seen)
+            except ValueError:
+                # cell of a variable not assigned yet
+                digest.update(b"<empty>")
+    elif inspect.isbuiltin(function):
+        owner = function.__self__
+        if owner is not None and not isinstance(owner, types.ModuleType):
+            # builtin method bound to an object, e.g. list.append
+            _value_digest(owner, digest, seen)
+        digest.update(f"{function.__module__}.{function.__qualname__}".encode())
+    elif hasattr(function, "named_parameters") and hasattr(function, "named_buffers"):
+        _module_digest(function, digest, seen)
+    else:
+        _object_digest(function, digest, seen)
+
+
+def fingerprint(function: Callable) -> Optional[str]:
+    """Fingerprint of a callable, which changes when its code changes, including the code of the helpers 
+    it calls (see _helpers_digest), or when the values it captures change, e.g. the arguments of a partial, 
+    closure cells or the attributes of a callable object. For nn modules the fingerprint covers the code of 
+    every submodule type, the architecture (representation of the module) and the shapes and dtypes of the 
+    parameters and buffers.
+
+    Args:
+        function (Callable): function, partial, callable object or nn module.
+
+    Returns:
+        Optional[str]: hexadecimal fingerprint, None if the callable depends on values which cannot be 
+        fingerprinted reliably (e.g. objects of library classes with a hidden state).
+    """
+    digest = hashlib.sha256()
+    try:
+        _callable_digest(function, digest, set())
+    except (_Unreliable, RecursionError):
+        return None
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent cache of the passed tests, stored in a local SQLite database. A test is identified by the
+    fingerprint of the callable, the pattern, the constraints and the checker settings. The least recently
+    used entries are evicted when the cache is full.
+    """
+
+    def __init__(self, path: str = ".dim_checker_cache.sqlite", max_entries: int = 10000,
+                 refresh: bool = False) -> None:
+        """Initializes result cache.
+
+        Args:
+            path (str, optional): path of the SQLite database. Defaults to ".dim_checker_cache.sqlite".
+            max_entries (int, optional): maximum number of stored tests. Defaults to 10000.
+            refresh (bool, optional): re-run the tests even when they are in the cache. Defaults to False.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.refresh = refresh
+        with self.__connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, fingerprint TEXT, pattern TEXT, used REAL)"
+            )
+
+    def __repr__(self) -> str:
+        """Creates string representation of the result cache.
+
+        Returns:
+            str: string representation of the result cache.
+        """
+        return f"Result cache {self.path} with {len(self)}/{self.max_entries} entries."
+
+    def __len__(self) -> int:
+        """Number of stored tests.
+
+        Returns:
+            int: number of stored tests.
+        """
+        with self.__connect() as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the database, committed and closed when leaving the context. Connections are 
+        not shared so that the cache can be used from several threads and processes.
+
+        Yields:
+            Iterator[sqlite3.Connection]: connection to the database.
+        """
+        with closing(sqlite3.connect(self.path, timeout=30)) as db, db:
+            yield db
+
+    def key(self, function: Callable, pattern: str, constraints: dict, settings: str,
+            relations: Sequence[str] = ()) -> tuple[Optional[str], Optional[str]]:
+        """Key of a test. Tests of callables which cannot be fingerprinted reliably have no key and are 
+        not cached.
+
+        Args:
+            function (Callable): tested function or nn module.
+            pattern (str): tested pattern.
+            constraints (dict): constraints over the dimensions.
+            settings (str): settings of the checker.
+            relations (Sequence[str], optional): relations between dimensions. Defaults to ().
+
+        Returns:
+            tuple[Optional[str], Optional[str]]: key of the test and fingerprint of the callable, None if
+            the callable cannot be fingerprinted.
+        """
+        function_fingerprint = fingerprint(function)
+        if function_fingerprint is None:
+            return None, None
+        test = f"{function_fingerprint}|{pattern}|{sorted(constraints.items())}|{list(relations)}|{settings}"
+        return hashlib.sha256(test.encode()).hexdigest(), function_fingerprint
+
+    def contains(self, key: str) -> bool:
+        """Check if a test passed before. Always False when refreshing.
+
+        Args:
+            key (str): key of the test.
+
+        Returns:
+            bool: True if the test is in the cache.
+        """
+        if self.refresh:
+            return False
+        with self.__connect() as db:
+            found = db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key)).rowcount
+        return found > 0
+
+    def add(self, key: str, function_fingerprint: str, pattern: str) -> None:
+        """Store a passed test, evicting the least recently used tests if the cache is full.
+
+        Args:
+            key (str): key of the test.
+            function_fingerprint (str): fingerprint of the tested callable.
+            pattern (str): tested pattern.
+        """
+        with self.__connect() as db:
+            db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                       (key, function_fingerprint, pattern, time.time()))
+            db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def invalidate(self, function: Callable = None) -> None:
+        """Remove the tests of a callable from the cache, or all the tests.
+
+        Args:
+            function (Callable, optional): callable whose tests are removed, None to remove all the
+            tests. Defaults to None.
+        """
+        with self.__connect() as db:
+            if function is None:
+                db.execute("DELETE FROM results")
+            else:
+                db.execute("DELETE FROM results WHERE fingerprint = ?", (fingerprint(function),))
@@ -0,0 +1,249 @@
+from collections import defaultdict
+from typing import Iterator
+import itertools
+import math
+import random
+
+from dim_checker.objects import CompiledPattern, Constraints
+
+# primes > 3 used as dimensions values.
+PRIMES = [
+    5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67,
+    71, 73, 79, 83, 89, 97
+]
+
+
+def _distinct_product(tables: list[list[int]]) -> Iterator[tuple[int, ...]]:
+    """Assignments taking one value from each table, all the values being distinct, in the order of
+    itertools.product. They are generated lazily by a depth first search.
+
+    Args:
+        tables (list[list[int]]): candidate values of each variable.
+
+    Yields:
+        Iterator[tuple[int, ...]]: assignments of distinct values.
+    """
+    if len(set().union(*tables)) < len(tables):
+        return
+    assignment = []
+
+    def extend() -> Iterator[tuple[int, ...]]:
+        if len(assignment) == len(tables):
+            yield tuple(assignment)
+            return
+        for value in tables[len(assignment)]:
+            if value not in assignment:
+                assignment.append(value)
+                yield from extend()
+                assignment.pop()
+
+    yield from extend()
+
+
+class SizeSelector:
+    """Select the variables values of a trial: distinct primes drawn at random, as small as needed
+    to keep the inputs within a budget of elements, such that all the input and output dimensions
+    take distinct values whenever possible.
+    """
+
+    def __init__(self, max_size: int = 100, max_numel: int = None, max_total_numel: int = None,
+                 attempts: int = 32) -> None:
+        """Initializes size selector.
+
+        Args:
+            max_size (int, optional): maximum value of a variable. Defaults to 100.
+            max_numel (int, optional): maximum number of elements of each input. Defaults to None.
+            max_total_numel (int, optional): maximum number of elements of all the inputs. Defaults to None.
+            attempts (int, optional): number of random draws before falling back to the smallest
+            primes. Defaults to 32.
+        """
+        self.primes = [p for p in PRIMES if p < max_size]
+        self.max_size = max_size
+        self.max_numel = max_numel
+        self.max_total_numel = max_total_numel
+        self.attempts = attempts
+
+    def __repr__(self) -> str:
+        """Creates string representation of the size selector.
+
+        Returns:
+            str: string representation of the size selector.
+        """
+        return f"Size selector with primes {self.primes}, max numel {self.max_numel} and max total numel {self.max_total_numel}."
+
+    def numels(self, pattern: CompiledPattern, variables: dict) -> list[int]:
+        """Number of elements of each input.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            variables (dict): variables values.
+
+        Returns:
+            list[int]: number of elements of each input.
+        """
+        return [math.prod(in_vf.evaluate(variables)) for in_vf in pattern.in_formulas]
+
+    def within_budget(self, pattern: CompiledPattern, variables: dict) -> bool:
+        """Check the inputs built from the variables values respect the budget.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            variables (dict): variables values.
+
+        Returns:
+            bool: True if the budget is respected.
+        """
+        if self.max_numel is None and self.max_total_numel is None:
+            return True
+        numels = self.numels(pattern, variables)
+        if self.max_numel is not None and max(numels, default=0) > self.max_numel:
+            return False
+        return self.max_total_numel is None or sum(numels) <= self.max_total_numel
+
+    def collisions(self, pattern: CompiledPattern, variables: dict) -> list[tuple[str, str]]:
+        """Find the pairs of distinct dimensions of the pattern taking the same value. A collision 
+        means that an output returning one dimension instead of the other is not detected.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            variables (dict): variables values.
+
+        Returns:
+            list[tuple[str, str]]: pairs of dimensions with the same value.
+        """
+        groups = defaultdict(list)
+        for dim in pattern.dims:
+            # output variables which are not inputs variables are free
+            if dim.variables <= variables.keys():
+                try:
+                    groups[dim.evaluate(variables)].append(dim.dim)
+                except ZeroDivisionError:
+                    continue
+        return [pair for dims in groups.values() for pair in itertools.combinations(dims, 2)]
+
+    def select(self, pattern: CompiledPattern, constraints: Constraints or dict, rng: random.Random) -> dict:
+        """Assign a distinct value to each free input variable, drawn from its candidate values (distinct primes 
+        unless relations restrict them, see Constraints.tables). Derived variables are then computed and draws 
+        breaking a relation are rejected. Draws for which two dimensions of the pattern (e.g. "(2*c+1)" and "l") 
+        take the same value are rejected too. When a random draw exceeds the budget the next draws use fewer, 
+        smaller values. If no draw is satisfying, the draws and the smallest values (see smallest) are searched 
+        for the assignment with the fewest collisions and elements.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            constraints (Constraints or dict): constraints, or constraints dictionnary.
+            rng (random.Random): random generator of the trial.
+
+        Raises:
+            ValueError: error raised if there are not enough primes or if the budget or the relations cannot 
+            be respected.
+
+        Returns:
+            dict: variables values.
+        """
+        if isinstance(constraints, dict):
+            constraints = Constraints(constraints)
+        free = self.free_variables(pattern, constraints)
+        self.__check_primes(free)
+        tables = constraints.tables(free, self.primes, self.max_size)
+        candidates = []
+        for _ in range(self.attempts):
+            variables = self.__draw(free, tables, rng) | constraints.constraints
+            variables = constraints.derive(variables)
+            if variables is None:
+                continue
+            if not self.within_budget(pattern, variables):
+                tables = {var: table[:max(len(free), len(table) * 3 // 4)] for var, table in tables.items()}
+                continue
+            if not self.collisions(pattern, variables):
+                return variables
+            candidates.append(variables)
+
+        # small values, placed to minimize the collisions and then the total number of elements
+        try:
+            candidates.append(self.smallest(pattern, constraints))
+        except ValueError:
+            if not candidates:
+                raise
+        return min(candidates, key=lambda v: (len(self.collisions(pattern, v)), sum(self.numels(pattern, v))))
+
+    def __check_primes(self, free: list[str]) -> None:
+        """Check there are enough primes to give a distinct value to each free variable.
+
+        Args:
+            free (list[str]): free input variables.
+
+        Raises:
+            ValueError: error raised if there are not enough primes.
+        """
+        if len(self.primes) < len(free):
+            raise ValueError(
+                "Not enough primes to test each dimension. Please consider increasing max_dim."
+            )
+
+    def free_variables(self, pattern: CompiledPattern, constraints: Constraints) -> list[str]:
+        """Input variables drawn by the selector: neither constrained nor derived from other variables.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            constraints (Constraints): constraints.
+
+        Returns:
+            list[str]: free input variables.
+        """
+        return [var for var in pattern.in_variables
+                if var not in constraints.constraints and var not in constraints.derived]
+
+    def __draw(self, free: list[str], tables: dict[str, list[int]], rng: random.Random) -> dict:
+        """Draw a value of each variable from its table, distinct from the values of the other variables
+        whenever the tables allow it. The variables with the fewest candidates are drawn first.
+
+        Args:
+            free (list[str]): free variables.
+            tables (dict[str, list[int]]): candidate values of each variable.
+            rng (random.Random): random generator of the trial.
+
+        Returns:
+            dict: variables values.
+        """
+        variables = {}
+        for var in sorted(free, key=lambda v: len(tables[v])):
+            unused = [value for value in tables[var] if value not in variables.values()]
+            variables[var] = rng.choice(unused or tables[var])
+        return variables
+
+    def smallest(self, pattern: CompiledPattern, constraints: Constraints or dict) -> dict:
+        """Assign the smallest distinct candidate values to the free input variables, placed to minimize the 
+        collisions and then the total number of elements of the inputs.
+
+        Args:
+            pattern (CompiledPattern): compiled pattern.
+            constraints (Constraints or dict): constraints, or constraints dictionnary.
+
+        Raises:
+            ValueError: error raised if there are not enough primes (as in select) or if the budget or the 
+            relations cannot be respected.
+
+        Returns:
+            dict: variables values.
+        """
+        if isinstance(constraints, dict):
+            constraints = Constraints(constraints)
+        free = self.free_variables(pattern, constraints)
+        self.__check_primes(free)
+        tables = constraints.tables(free, self.primes, self.max_size)
+        tables = [tables[var][:len(free) + 2] for var in free]
+        candidates = []
+        # at most 720 assignments are generated, distinct values first whenever the tables allow it
+        for assignments in [_distinct_product(tables), itertools.product(*tables)]:
+            for assignment in itertools.islice(assignments, 720):
+                variables = constraints.derive(dict(zip(free, assignment)) | constraints.constraints)
+                if variables is not None and self.within_budget(pattern, variables):
+                    candidates.append(variables)
+            if candidates:
+                break
+        if not candidates:
+            raise ValueError(
+                f"The inputs of pattern {pattern.pattern} exceed the budget or break the relations even with the smallest values."
+            )
+        return min(candidates, key=lambda v: (len(self.collisions(pattern, v)), sum(self.numels(pattern, v))))
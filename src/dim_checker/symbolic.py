@@ -0,0 +1,82 @@
+from typing import Callable, Optional, Sequence
+
+import torch
+
+from dim_checker.objects import CompiledPattern
+
+
+def verify_symbolic(function: Callable, pattern: CompiledPattern, constraints: dict,
+                    hints: dict, samples: Sequence[dict] = ()) -> Optional[list[str]]:
+    """Trace the callable once on fake tensors whose sizes are symbols, one symbol per variable, and
+    compare the symbolic output shapes with the output formulas. The proof only holds under the guards
+    torch recorded while tracing, e.g. "Eq(c, 7)" when the callable branches on c == 7. Guards which do
+    not hold for every sample (sizes allowed by the pattern and relations) restrict the proof to some
+    sizes only, and the proof is rejected.
+
+    Args:
+        function (Callable): function or nn module to test.
+        pattern (CompiledPattern): pattern describing the input and expected output dimensions.
+        constraints (dict): constraints over the dimensions, constrained variables are not symbolic.
+        hints (dict): example value of each variable, used by torch to resolve guards while tracing.
+        samples (Sequence[dict], optional): values of the symbolic variables the guards must hold for.
+        Defaults to ().
+
+    Raises:
+        Exception: any error raised while tracing, e.g. unsupported operations.
+
+    Returns:
+        Optional[list[str]]: guards (conditions on the variables) under which the output shapes
+        are proved correct, or None if the symbolic output shapes do not match the pattern or if a
+        guard does not hold for a sample.
+    """
+    import sympy
+    from torch._dynamo.source import ConstantSource
+    from torch._subclasses.fake_tensor import FakeTensorMode
+    from torch.fx.experimental.symbolic_shapes import DimDynamic, ShapeEnv
+
+    shape_env = ShapeEnv()
+    variables = dict(constraints)
+    # symbols created by torch, renamed after the variables in the guards
+    names = {}
+    for var in pattern.in_variables:
+        if var not in constraints:
+            symbol = shape_env.create_symbol(hints[var], ConstantSource(var),
+                                             dynamic_dim=DimDynamic.DYNAMIC)
+            variables[var] = shape_env.create_symintnode(symbol, hint=hints[var])
+            names[symbol] = sympy.Symbol(var)
+
+    with FakeTensorMode(shape_env=shape_env, allow_non_fake_inputs=True) as mode:
+        in_vectors = [torch.empty(in_vf.evaluate(variables)) for in_vf in pattern.in_formulas]
+        if isinstance(function, torch.nn.Module):
+            tensors = {
+                name: mode.from_tensor(t, static_shapes=True)
+                for name, t in [*function.named_parameters(), *function.named_buffers()]
+            }
+            outputs = torch.func.functional_call(function, tensors, tuple(in_vectors))
+        else:
+            outputs = function(*in_vectors)
+
+    if not isinstance(outputs, tuple):
+        outputs = (outputs,)
+    if len(outputs) != len(pattern.out_formulas):
+        return None
+
+    def expr(size):
+        return size.node.expr if isinstance(size, torch.SymInt) else sympy.Integer(size)
+
+    for out, out_vf in zip(outputs, pattern.out_formulas):
+        if len(out.shape) != len(out_vf.dims):
+            return None
+        for dim, size in zip(out_vf.dims, out.shape):
+            # output variables which are not inputs variables only need to be consistent
+            if dim.variable is not None and dim.variable not in variables:
+                variables[dim.variable] = size
+            elif sympy.simplify(expr(size) - expr(dim.evaluate(variables))) != 0:
+                return None
+
+    guards = [guard.expr.xreplace(names) for guard in shape_env.guards]
+    for sample in samples:
+        values = {sympy.Symbol(var): sympy.Integer(value) for var, value in sample.items()}
+        if not all(bool(guard.subs(values)) for guard in guards):
+            return None
+    return [str(guard) for guard in guards]
@@ -0,0 +1,141 @@
+from array import array
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+import threading
+
+if TYPE_CHECKING:
+    import torch
+
+
+class LayerTrace:
+    """Input and output shapes of the layers of a nn module, in execution order. The shapes are
+    stored flattened in integer arrays to keep the trace compact.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty trace.
+        """
+        self.clear()
+
+    def __repr__(self) -> str:
+        """Creates string representation of the trace.
+
+        Returns:
+            str: string representation of the trace.
+        """
+        s = f"Trace of {len(self)} layer(s): "
+        for name, in_shapes, out_shapes in self:
+            s += f"\n -> {name}: {in_shapes} -> {out_shapes}"
+        return s
+
+    def __len__(self) -> int:
+        """Number of layers calls in the trace.
+
+        Returns:
+            int: number of layers calls.
+        """
+        return len(self.names)
+
+    def __getitem__(self, i: int) -> tuple[str, list[tuple], list[tuple]]:
+        """Get a layer call of the trace.
+
+        Args:
+            i (int): index of the layer call.
+
+        Returns:
+            tuple[str, list[tuple], list[tuple]]: name of the layer, input shapes and output shapes.
+        """
+        shapes = []
+        start = self.dims_starts[i]
+        for rank in self.ranks[self.ranks_starts[i]:self.ranks_starts[i + 1]]:
+            shapes.append(tuple(self.dims[start:start + rank]))
+            start += rank
+        nb_inputs = self.nb_inputs[i]
+        return self.names[i], shapes[:nb_inputs], shapes[nb_inputs:]
+
+    def clear(self) -> None:
+        """Remove all the layers calls from the trace.
+        """
+        self.names = []
+        self.nb_inputs = array("q")
+        self.ranks = array("q")
+        self.dims = array("q")
+        self.ranks_starts = array("q", [0])
+        self.dims_starts = array("q", [0])
+
+    def append(self, name: str, in_shapes: list, out_shapes: list) -> None:
+        """Add a layer call to the trace.
+
+        Args:
+            name (str): name of the layer.
+            in_shapes (list): shapes of the input tensors.
+            out_shapes (list): shapes of the output tensors.
+        """
+        self.names.append(name)
+        self.nb_inputs.append(len(in_shapes))
+        for shape in in_shapes + out_shapes:
+            self.ranks.append(len(shape))
+            self.dims.extend(shape)
+        self.ranks_starts.append(len(self.ranks))
+        self.dims_starts.append(len(self.dims))
+
+    def diverging_layer(self, value: int) -> Optional[str]:
+        """Find the layer which lost a dimension of the expected output: the last layer receiving a
+        dimension of this value and returning none.
+
+        Args:
+            value (int): expected value of the dimension missing from the output.
+
+        Returns:
+            Optional[str]: name of the layer, None if no layer lost the dimension.
+        """
+        for i in reversed(range(len(self))):
+            name, in_shapes, out_shapes = self[i]
+            if any(value in shape for shape in in_shapes) and not any(value in shape for shape in out_shapes):
+                return name
+        return None
+
+
+def _shapes(tensors) -> list[tuple]:
+    """Shapes of the tensors found in nested tuples and lists.
+
+    Args:
+        tensors: tensor or nested tuples and lists of tensors.
+
+    Returns:
+        list[tuple]: shapes of the tensors.
+    """
+    if isinstance(tensors, (tuple, list)):
+        return [shape for t in tensors for shape in _shapes(t)]
+    if hasattr(tensors, "shape"):
+        return [tuple(tensors.shape)]
+    return []
+
+
+@contextmanager
+def record_layers(module: "torch.nn.Module", trace: LayerTrace) -> Iterator[None]:
+    """Record the shapes of the leaf layers of a module in a trace, with forward hooks which are
+    removed when leaving the context. The trace is cleared first. Only the calls of the current thread
+    are recorded, so that parallel trials on the same module each get their own layers.
+
+    Args:
+        module (torch.nn.Module): traced module.
+        trace (LayerTrace): trace to fill.
+
+    Yields:
+        Iterator[None]: context of the recording.
+    """
+    trace.clear()
+    thread = threading.get_ident()
+    handles = []
+    for name, layer in module.named_modules():
+        if next(layer.children(), None) is None:
+            def hook(layer, args, output, name=name or type(layer).__name__):
+                if threading.get_ident() == thread:
+                    trace.append(name, _shapes(args), _shapes(output))
+            handles.append(layer.register_forward_hook(hook))
+    try:
+        yield
+    finally:
+        for handle in handles:
+            handle.remove()
@@ -1,19 +1,22 @@
 import ast
+from types import CodeType
 
 
 
-def evaluate_formula(formula: str, variables: dict[str, int]) -> int:
-    """Evaluate formula according to the predefined variables.
+FORMULA_GLOBALS = {"__builtins__": None}
+
+
+def compile_formula(formula: str) -> CodeType:
+    """Check the formula against the whitelist of allowed nodes and compile it.
 
     Args:
         formula (str): formula.
-        variables (dict[str, int]): predefined variables, e.g. {"n": 3}.
 
     Raises:
         ValueError: error raised if the formula is invalid.
 
     Returns:
-        int: value of the evaluated formula.
+        CodeType: code object of the formula, to be evaluated with FORMULA_GLOBALS.
     """
     whitelist = (
         ast.Expression,
@@ -31,7 +34,61 @@ def evaluate_formula(formula: str, variables: dict[str, int]) -> int:
     tree = ast.parse(formula, mode='eval')
     valid = all(isinstance(node, whitelist) for node in ast.walk(tree))
     if valid:
-        return eval(compile(tree, filename='', mode='eval'),
-                    {"__builtins__": None}, variables)
+        return compile(tree, filename='', mode='eval')
     else:
         raise ValueError(f"Formula {formula} is not valid.")
+
+
+def parse_relation(relation: str) -> ast.Expression:
+    """Check a relation between variables, e.g. "h % 8 == 0" or "4 <= l <= 64", against the whitelist 
+    of allowed nodes: the nodes of formulas plus comparisons and boolean operators.
+
+    Args:
+        relation (str): relation.
+
+    Raises:
+        ValueError: error raised if the relation is invalid or is not a comparison.
+
+    Returns:
+        ast.Expression: syntax tree of the relation, to be compiled with compile.
+    """
+    whitelist = (
+        ast.Expression,
+        ast.Compare,
+        ast.BoolOp,
+        ast.boolop,
+        ast.Name,
+        ast.Load,
+        ast.BinOp,
+        ast.UnaryOp,
+        ast.operator,
+        ast.unaryop,
+        ast.cmpop,
+        ast.Num,
+    )
+
+    try:
+        tree = ast.parse(relation, mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Relation {relation} is not valid.") from None
+    valid = all(isinstance(node, whitelist) for node in ast.walk(tree))
+    if valid and isinstance(tree.body, (ast.Compare, ast.BoolOp)):
+        return tree
+    else:
+        raise ValueError(f"Relation {relation} is not valid.")
+
+
+def evaluate_formula(formula: str, variables: dict[str, int]) -> int:
+    """Evaluate formula according to the predefined variables.
+
+    Args:
+        formula (str): formula.
+        variables (dict[str, int]): predefined variables, e.g. {"n": 3}.
+
+    Raises:
+        ValueError: error raised if the formula is invalid.
+
+    Returns:
+        int: value of the evaluated formula.
+    """
+    return eval(compile_formula(formula), FORMULA_GLOBALS, variables)
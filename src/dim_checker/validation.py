@@ -0,0 +1,98 @@
+from typing import Sequence, Union
+
+import numpy as np
+
+from dim_checker.objects import CompiledDim, Constraints, Pattern, ValidationReport, compile_pattern
+
+
+def _solve_columns(dim: CompiledDim, size: np.ndarray, variables: dict[str, np.ndarray]) -> np.ndarray:
+    """Bind the only unbound variable of the dimension for all the records at once, see CompiledDim.solve.
+
+    Args:
+        dim (CompiledDim): compiled dimension.
+        size (np.ndarray): observed values of the dimension.
+        variables (dict[str, np.ndarray]): variables values of the records, updated in place.
+
+    Returns:
+        np.ndarray: boolean array, False for the records where the variable could not be solved.
+    """
+    unbound = [var for var in dim.variables if var not in variables]
+    if len(unbound) != 1:
+        return np.ones(len(size), dtype=bool)
+    var = unbound[0]
+    # the formula is affine in var: size = a*var + b
+    zeros = np.zeros(len(size), dtype=np.int64)
+    b = dim.evaluate(variables | {var: zeros})
+    a = dim.evaluate(variables | {var: zeros + 1}) - b
+    safe_a = np.where(a == 0, 1, a)
+    value = (size - b) // safe_a
+    variables[var] = value
+    return (a != 0) & ((size - b) % safe_a == 0) & (value > 0)
+
+
+def validate_shapes(pattern: Union[str, Pattern], in_shapes: Sequence[np.ndarray],
+                    out_shapes: Sequence[np.ndarray], **constraints) -> ValidationReport:
+    """Validate logged input and output shapes against a pattern, without running any callable. The
+    variables are bound and the formulas evaluated column-wise, for all the records at once, with the
+    same unification as the checker (see CompiledVectorFormula.match).
+
+    Args:
+        pattern (str or Pattern): pattern describing the input and expected output dimensions.
+        in_shapes (Sequence[np.ndarray]): for each input of the pattern, an integer array of shape
+        (nb_records, nb_dims) holding the observed shapes.
+        out_shapes (Sequence[np.ndarray]): for each output of the pattern, an integer array of shape
+        (nb_records, nb_dims) holding the observed shapes.
+        constraints: constraints over the dimensions.
+
+    Raises:
+        ValueError: error raised if the arrays do not match the number of vectors or dimensions of the
+        pattern, or do not have the same number of records.
+
+    Returns:
+        ValidationReport: mask of the valid records and number of violations of each dimension.
+    """
+    if isinstance(pattern, Pattern):
+        pattern = pattern.pattern
+    compiled = compile_pattern(pattern)
+    formulas = compiled.in_formulas + compiled.out_formulas
+    shapes = [np.asarray(s, dtype=np.int64) for s in [*in_shapes, *out_shapes]]
+
+    if len(in_shapes) != len(compiled.in_formulas) or len(out_shapes) != len(compiled.out_formulas):
+        raise ValueError(
+            f"Pattern {pattern} has {len(compiled.in_formulas)} input(s) and {len(compiled.out_formulas)} output(s), "
+            f"got {len(in_shapes)} input and {len(out_shapes)} output array(s)."
+        )
+    nb_records = len(shapes[0]) if shapes else 0
+    for vf, s in zip(formulas, shapes):
+        if s.ndim != 2 or s.shape != (nb_records, len(vf.dims)):
+            raise ValueError(
+                f"Shapes of {vf.vector_formula} must be an array of shape ({nb_records}, {len(vf.dims)}), got {s.shape}."
+            )
+
+    variables = {
+        var: np.full(nb_records, value, dtype=np.int64)
+        for var, value in Constraints(constraints).constraints.items()
+    }
+    failed = {dim.dim: np.zeros(nb_records, dtype=bool) for dim in compiled.dims}
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for vf, s in zip(formulas, shapes):
+            for dim, size in zip(vf.dims, s.T):
+                if dim.variable is not None:
+                    if dim.variable not in variables:
+                        variables[dim.variable] = size
+                    else:
+                        failed[dim.dim] |= variables[dim.variable] != size
+
+            for dim, size in zip(vf.dims, s.T):
+                if dim.variable is None:
+                    solved = _solve_columns(dim, size, variables)
+                    if not dim.variables <= variables.keys():
+                        failed[dim.dim][:] = True
+                        continue
+                    failed[dim.dim] |= ~solved | (dim.evaluate(variables) != size)
+
+    mask = np.ones(nb_records, dtype=bool)
+    for f in failed.values():
+        mask &= ~f
+    violations = {dim: int(f.sum()) for dim, f in failed.items()}
+    return ValidationReport(pattern, mask, violations)
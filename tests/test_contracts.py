@@ -0,0 +1,90 @@
+import torch
+from dim_checker.contracts import dim_contract, set_contracts_enabled
+
+import pytest
+
+
+def test_contract() -> None:
+
+    @dim_contract("bcl->b(2*c)l")
+    def f(x):
+        return torch.cat([x, x], dim=1)
+
+    f(torch.ones(2, 3, 5))
+    f(torch.ones(4, 1, 7))
+    assert (f.contract.checks, f.contract.violations) == (2, 0)
+
+
+@pytest.mark.parametrize("pattern, constraints", [
+    ("bcl->bcl", {}),
+    ("bcl->b(2*c+1)l", {}),
+    ("bcl->b(2*c)l", {"c": 4}),
+    ("bcl->b(2*c)l, bl", {}),
+])
+def test_contract_violation(pattern: str, constraints: dict) -> None:
+
+    @dim_contract(pattern, **constraints)
+    def f(x):
+        return torch.cat([x, x], dim=1)
+
+    with pytest.raises(Exception) as excinfo:
+        f(torch.ones(2, 3, 5))
+
+    assert not "Error should have been raised." in str(excinfo.value)
+    assert f.contract.violations == 1
+
+
+def test_contract_binds_formulas() -> None:
+
+    class Module(torch.nn.Module):
+
+        @dim_contract("b(2*c+1)l->bcl")
+        def forward(self, x):
+            return x[:, :(x.shape[1] - 1) // 2]
+
+    Module()(torch.ones(2, 7, 5))
+    with pytest.raises(AssertionError):
+        Module()(torch.ones(2, 6, 5))
+
+
+def test_contract_sampling_and_kill_switch() -> None:
+
+    @dim_contract("bcl->bcl", sample_rate=3, strict=False)
+    def f(x):
+        return x[..., :1]
+
+    for _ in range(6):
+        f(torch.ones(2, 3, 5))
+    assert (f.contract.calls, f.contract.checks, f.contract.violations) == (6, 2, 2)
+
+    set_contracts_enabled(False)
+    try:
+        f(torch.ones(2, 3, 5))
+    finally:
+        set_contracts_enabled(True)
+    assert f.contract.calls == 6
+
+
+def test_contract_keyword_inputs() -> None:
+
+    class Module(torch.nn.Module):
+
+        @dim_contract("bcl->bcl")
+        def forward(self, x, scale=2):
+            return x * scale
+
+    Module()(x=torch.ones(2, 3, 5))
+    Module()(torch.ones(2, 3, 5), scale=3)
+
+    with pytest.raises(ValueError):
+        dim_contract("bcl,bl->bcl")(lambda x: x)
+
+
+def test_contract_unsolved_input() -> None:
+
+    @dim_contract("b(c*c)->bc", strict=False)
+    def f(x):
+        return x[:, :int(x.shape[1] ** 0.5)]
+
+    f(torch.ones(2, 9))
+    assert f.contract.violations == 0
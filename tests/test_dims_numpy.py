@@ -41,3 +41,22 @@ def test_error_sum_last_dim(pattern: str, constraints: dict) -> None:
         DimChecker().test_dims(f, pattern, **constraints)
 
     assert not "Error should have been raised." in str(excinfo.value)
+
+
+def test_profile() -> None:
+
+    import numpy as np
+    import tracemalloc
+
+    def f(x):
+        return np.concatenate([x, x], axis=1)
+
+    checker = DimChecker(eval_type="numpy", profile=True)
+    report = checker.test_dims(f, "bcl->b(2*c)l")
+    # numpy arrays are traced by tracemalloc
+    assert all(phase.peak_memory > 0 for phase in report.trials[0].phases if phase.name != "check")
+
+    # concurrent tests share the tracing, which is stopped by the last one
+    batch = DimChecker(eval_type="numpy", profile=True, workers=4).test_many([(f, "bcl->b(2*c)l")] * 8)
+    assert all(case.passed for case in batch.cases)
+    assert not tracemalloc.is_tracing()
@@ -1,5 +1,11 @@
+import asyncio
+import random
+import threading
+import time
 import torch
 from dim_checker.dim_check import DimChecker
+from dim_checker.errors.resource_errors import ResourceLimitError, TrialTimeoutError
+from dim_checker.errors.shape_errors import DimensionError
 
 import pytest
 
@@ -145,3 +151,408 @@ def test_error_multi_output(pattern: str, constraints: dict) -> None:
         DimChecker().test_dims(f, pattern, **constraints)
 
     assert not "Error should have been raised." in str(excinfo.value)
+
+
+def test_meta_eval_mode() -> None:
+
+    conv = torch.nn.Conv1d(3, 8, kernel_size=3, padding=1)
+    report = DimChecker(eval_mode="meta", depth=2).test_dims(conv, "bcl->bnl", c=3, n=8)
+
+    assert report.eval_mode == "meta"
+    assert conv.weight.device == torch.device("cpu")
+
+
+def test_meta_eval_mode_fallback() -> None:
+
+    def f(x):
+        # data dependent operation, not supported by meta tensors
+        return x[..., :int(x.abs().sum().item() > -1)]
+
+    report = DimChecker(eval_mode="meta").test_dims(f, "bcl->bcn", n=1)
+    assert report.eval_mode == "real"
+
+    with pytest.raises(Exception) as excinfo:
+        DimChecker(eval_mode="meta").test_dims(f, "bcl->bcl")
+
+    assert not "Error should have been raised." in str(excinfo.value)
+
+
+def sum_last_dim(x):
+    return torch.sum(x, dim=-1,  keepdim=True)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_trials(executor: str) -> None:
+
+    report = DimChecker(depth=4, workers=2, executor=executor).test_dims(sum_last_dim, "bcl->bcn", n=1)
+    assert len(report.trials) == 4
+
+    with pytest.raises(AssertionError) as excinfo:
+        DimChecker(depth=4, workers=2, executor=executor).test_dims(sum_last_dim, "bcl->bcl")
+
+    assert "Issue with dimension 'l'" in str(excinfo.value)
+
+
+def test_many() -> None:
+
+    cases = [
+        (sum_last_dim, "bcl->bcn", {"n": 1}),
+        (sum_last_dim, "bcl->bcl"),
+        (sum_last_dim, "bc->bcn->b"),
+        (sum_last_dim, "bclk->bcln", {"n": 1}),
+    ]
+    batch = DimChecker(workers=2).test_many(cases)
+
+    assert [case.passed for case in batch.cases] == [True, False, False, True]
+    assert isinstance(batch.cases[1].error, AssertionError)
+    assert batch.cases[0].cost < batch.cases[3].cost
+    assert not batch.passed and len(batch.failures) == 2
+
+
+def test_symbolic() -> None:
+
+    strided = torch.nn.Conv1d(3, 8, kernel_size=3, stride=2)
+    report = DimChecker(symbolic=True).test_dims(strided, "bcl->bn((l-3)//2+1)", c=3, n=8)
+    assert report.proved and report.trials[0].guards == ["l >= 3"]
+
+    # the padded convolution guards its implementation on the batch size, numeric trials are run instead
+    conv = torch.nn.Conv1d(3, 8, kernel_size=3, padding=1)
+    report = DimChecker(symbolic=True).test_dims(conv, "bcl->bnl", c=3, n=8)
+    assert not report.proved
+
+    report = DimChecker(symbolic=True).test_dims(lambda x: torch.cat([x, x, x[:, :1]], dim=1), "bcl->b(2*c+1)l")
+    assert report.proved
+
+    # symbolic shapes do not match, numeric trials are run and fail
+    with pytest.raises(AssertionError):
+        DimChecker(symbolic=True).test_dims(conv, "bcl->bcl", c=3)
+
+    # data dependent shapes cannot be traced, numeric trials are run instead
+    def f(x):
+        return x[..., :int(x.abs().sum().item() > -1)]
+
+    report = DimChecker(symbolic=True).test_dims(f, "bcl->bcn", n=1)
+    assert not report.proved and report.eval_mode == "real"
+
+
+@pytest.mark.parametrize("options", [{}, {"staged": True}, {"symbolic": True}, {"isolated": True}])
+def test_depth_zero(options: dict) -> None:
+
+    report = DimChecker(depth=0, **options).test_dims(sum_last_dim, "bcl->bcn", n=1)
+    assert report.trials == []
+
+
+def test_symbolic_size_branch() -> None:
+
+    # the trace is only valid for c == 7, it must not be reported as a proof
+    def g(x):
+        return x if x.shape[1] == 7 else x[:, :1]
+
+    for seed in range(10):
+        random.seed(seed)
+        try:
+            report = DimChecker(symbolic=True).test_dims(g, "bc->bc", "c <= 7")
+        except AssertionError:
+            continue
+        assert not report.proved
+
+
+def test_profile() -> None:
+
+    records = []
+    report = DimChecker(depth=2, profile=True, profile_hook=records.append).test_dims(sum_last_dim, "bcl->bcn", n=1)
+
+    assert [phase.name for phase in report.phases] == ["parse"]
+    for trial in report.trials:
+        assert [phase.name for phase in trial.phases] == ["inputs", "forward", "check"]
+        assert all(phase.seconds >= 0 for phase in trial.phases)
+        # torch tensors on the cpu are not traced
+        assert [phase.peak_memory for phase in trial.phases] == [None, None, None]
+    assert report.phases[0].peak_memory >= 0
+    assert len(records) == 7
+    assert set(report.timings) == {"parse", "inputs", "forward", "check"}
+
+
+def test_profile_string_device() -> None:
+
+    report = DimChecker(depth=2, profile=True, eval_device="cpu").test_dims(sum_last_dim, "bcl->bcn", n=1)
+
+    assert [phase.name for phase in report.phases] == ["parse"]
+    assert all(phase.peak_memory is None for trial in report.trials for phase in trial.phases)
+
+
+@pytest.mark.parametrize("eval_mode", ["real", "meta"])
+def test_trace_layers(eval_mode: str) -> None:
+
+    model = torch.nn.Sequential(
+        torch.nn.Conv1d(3, 8, kernel_size=3, padding=1),
+        torch.nn.ReLU(),
+        torch.nn.Conv1d(8, 8, kernel_size=3),
+        torch.nn.ReLU(),
+    )
+    checker = DimChecker(trace_layers=True, eval_mode=eval_mode)
+
+    with pytest.raises(AssertionError) as excinfo:
+        checker.test_dims(model, "bcl->bnl", c=3, n=8)
+
+    assert excinfo.value.layer == "2"
+    assert "First diverging layer: '2'" in str(excinfo.value)
+    assert len(excinfo.value.layer_trace) == 4
+    assert all(not layer._forward_hooks for layer in model)
+
+
+def test_trace_layers_threads() -> None:
+
+    from concurrent.futures import ThreadPoolExecutor
+    from dim_checker.tracing import LayerTrace, record_layers
+
+    model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.ReLU())
+    barrier = threading.Barrier(4)
+
+    def trial(batch: int) -> LayerTrace:
+        trace = LayerTrace()
+        with record_layers(model, trace):
+            barrier.wait()
+            for _ in range(5):
+                model(torch.ones(batch, 3))
+        return trace
+
+    with ThreadPoolExecutor(4) as pool:
+        traces = list(pool.map(trial, [2, 5, 7, 11]))
+    # each trace only holds the layers called by its own thread
+    for batch, trace in zip([2, 5, 7, 11], traces):
+        assert len(trace) == 10
+        assert all(in_shapes[0][0] == batch for _, in_shapes, _ in trace)
+
+
+class RecordingSum(torch.nn.Module):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen = []
+
+    def forward(self, x):
+        self.seen.append((self.training, torch.is_grad_enabled(), threading.get_ident()))
+        return x.sum(-1)
+
+
+class RecordingConv(torch.nn.Module):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 4, 1)
+        self.seen = []
+
+    def forward(self, x):
+        self.seen.append((self.training, torch.is_grad_enabled(), x.is_contiguous(memory_format=torch.channels_last)))
+        return self.conv(x)
+
+
+def test_execution_context() -> None:
+
+    module = RecordingConv()
+    DimChecker(channels_last=True, autocast=True).test_dims(module, "bchw->bnhw", c=3, n=4)
+    assert module.seen == [(False, False, True)]
+    assert module.training and module.conv.training
+
+    DimChecker(inference_mode=False, module_eval=False).test_dims(module, "bchw->bnhw", c=3, n=4)
+    assert module.seen[-1] == (True, True, False)
+
+
+@pytest.mark.parametrize("compile_mode", ["dynamic", "fixed"])
+def test_compile_mode(compile_mode: str) -> None:
+
+    function = torch.compile(lambda x: x.sum(-1), backend="eager")
+    checker = DimChecker(depth=3, compile_mode=compile_mode)
+    checker.test_dims(function, "bcl->bc")
+    # the second test reuses the compiled graphs of the first one
+    assert checker.test_dims(function, "bcl->bc").compiles == 0
+
+
+def test_shrink_failure() -> None:
+
+    checker = DimChecker(depth=1)
+    with pytest.raises(DimensionError) as info:
+        checker.test_dims(sum_last_dim, "bcl->bcl")
+    error = info.value
+    assert sorted(error.variables.values()) == [5, 7, 11]
+    assert str(error.variables) in "".join(error.__notes__)
+
+    # the reproducer can be replayed
+    with pytest.raises(DimensionError):
+        checker.run_trial(sum_last_dim, "bcl->bcl", {}, error.seed, error.variables)
+
+    with pytest.raises(DimensionError) as info:
+        DimChecker(shrink_budget=0).test_dims(sum_last_dim, "bcl->bcl", c=2)
+    assert info.value.variables["c"] == 2
+
+
+def test_staged() -> None:
+
+    report = DimChecker(depth=3, staged=True).test_dims(sum_last_dim, "bcl->bcn", n=1)
+    assert sorted(report.trials[0].variables.values()) == [1, 5, 7, 11]
+    assert len(report.trials) == 3
+
+    # a failing smoke trial skips the full size trials
+    calls = []
+    def transposed(x):
+        calls.append(x.shape)
+        return x.transpose(1, 2)
+    with pytest.raises(DimensionError):
+        DimChecker(depth=3, staged=True).test_dims(transposed, "bcl->bcl")
+    assert len(calls) == 1
+
+
+def test_relations() -> None:
+
+    def cat(x, y):
+        # the model only accepts lengths divisible by 4
+        assert x.shape[-1] % 4 == 0
+        return torch.cat([x, y], 1)
+    report = DimChecker(depth=3).test_dims(cat, "bcl,bnl->b(c+n)l", "l % 4 == 0", "n == c + 1")
+    assert all(trial.variables["n"] == trial.variables["c"] + 1 for trial in report.trials)
+
+
+@pytest.mark.parametrize("function, in_formula, constraints, expected", [
+    (lambda x: torch.cat([x, x, x[:, :1]], 1), "bcl", {}, "bcl->b(2*c+1)l"),
+    (torch.nn.Conv1d(3, 8, 3), "bcl", {"c": 3}, "bcl->b(8)(l-2)"),
+    (torch.nn.Conv1d(3, 3, 3), "bcl", {"c": 3}, "bcl->bc(l-2)"),
+    (lambda x, y: (x.transpose(1, 2), x.flatten(1) * 0 + y.sum(-1, keepdim=True)), "bcl, bn", {},
+     "bcl, bn->blc, b(c*l)"),
+    (lambda x: x.reshape(x.shape[0], -1), "bchw", {}, "bchw->b(c*h*w)"),
+])
+def test_infer_pattern(function, in_formula: str, constraints: dict, expected: str) -> None:
+
+    checker = DimChecker()
+    pattern = checker.infer_pattern(function, in_formula, **constraints)
+    assert pattern == expected
+    checker.test_dims(function, pattern, **constraints)
+
+
+def test_infer_pattern_reproducible() -> None:
+
+    shapes = []
+    def f(x):
+        shapes.append(tuple(x.shape))
+        return x[:, 1:]
+    for _ in range(2):
+        random.seed(0)
+        assert DimChecker().infer_pattern(f, "bc") == "bc->b(c-1)"
+    assert shapes[:len(shapes) // 2] == shapes[len(shapes) // 2:]
+
+
+def test_infer_pattern_not_polynomial() -> None:
+
+    with pytest.raises(ValueError):
+        DimChecker().infer_pattern(torch.nn.Conv1d(3, 8, 3, stride=2), "bcl", c=3)
+
+
+async def remote_sum_last_dim(x):
+    # stand-in for a remote executor
+    await asyncio.sleep(0.1)
+    return x.sum(-1, keepdim=True)
+
+
+def test_dims_async() -> None:
+
+    active, peak = 0, 0
+    async def remote(x):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return x.sum(-1, keepdim=True)
+
+    checker = DimChecker(depth=8, concurrency=4)
+    report = asyncio.run(checker.test_dims_async(remote, "bcl->bcn", n=1))
+    # the waits of the trials overlap, up to the concurrency limit
+    assert peak == 4
+    assert len(report.trials) == 8
+
+    with pytest.raises(DimensionError) as info:
+        asyncio.run(checker.test_dims_async(remote_sum_last_dim, "bcl->bcl"))
+    assert info.value.variables is not None
+
+
+def test_atest_many() -> None:
+
+    cases = [
+        (remote_sum_last_dim, "bcl->bcn", {"n": 1}),
+        (remote_sum_last_dim, "bcl->bcl"),
+        (sum_last_dim, "bcl->bcn", {"n": 1}, ["c <= 10"]),
+    ]
+    report = asyncio.run(DimChecker(depth=2).atest_many(cases))
+    assert [case.passed for case in report.cases] == [True, False, True]
+    assert isinstance(report.cases[1].error, DimensionError)
+
+
+def allocate_large(x):
+    return torch.empty(2**34, x.shape[0])
+
+
+def sleep_sum_last_dim(x):
+    time.sleep(30)
+    return sum_last_dim(x)
+
+
+def test_isolated() -> None:
+
+    checker = DimChecker(depth=3, isolated=True, timeout=60)
+    report = checker.test_dims(sum_last_dim, "bcl->bcn", n=1)
+    assert len(report.trials) == 3
+    checker.test_dims(torch.nn.Linear(5, 3), "bi->bo", i=5, o=3)
+
+    # failures are shrunk in the worker and raised by the checker
+    with pytest.raises(DimensionError) as info:
+        checker.test_dims(sum_last_dim, "bcl->bcl")
+    assert sorted(info.value.variables.values()) == [5, 7, 11]
+
+    # each test runs the current state of the callable
+    module = torch.nn.Linear(5, 3)
+    checker.test_dims(module, "bi->bo", i=5, o=3)
+    module.weight.data, module.bias.data = torch.ones(4, 5), torch.ones(4)
+    with pytest.raises(DimensionError):
+        checker.test_dims(module, "bi->bo", i=5, o=3)
+
+
+def test_resource_limits() -> None:
+
+    # inputs over the memory limit are rejected before calling the callable
+    calls = []
+    def f(x):
+        calls.append(x.shape)
+        return sum_last_dim(x)
+    with pytest.raises(ResourceLimitError):
+        DimChecker(memory_limit=1000).test_dims(f, "bcl->bcn", n=1, c=50, l=50)
+    assert not calls
+
+    checker = DimChecker(isolated=True, memory_limit=2**28, timeout=1)
+    with pytest.raises(ResourceLimitError) as info:
+        checker.test_dims(allocate_large, "bcl->bcl")
+    assert info.value.resource == "memory"
+
+    # the trial sleeping 30s is killed after 1s
+    with pytest.raises(TrialTimeoutError):
+        checker.test_dims(sleep_sum_last_dim, "bcl->bcn", n=1)
+
+    # the killed worker is replaced
+    checker.test_dims(sum_last_dim, "bcl->bcn", n=1)
+
+    with pytest.raises(ValueError):
+        DimChecker(timeout=1)
+
+
+def test_dims_async_execution_context() -> None:
+
+    module = torch.nn.Sequential(torch.nn.BatchNorm1d(3), RecordingSum())
+    asyncio.run(DimChecker(depth=3).test_dims_async(module, "bcl->bc", c=3))
+    # the module ran in eval mode without autograd, off the loop thread, and its state is restored
+    assert module[0].num_batches_tracked == 0
+    assert module.training
+    assert all(not training and not grad for training, grad, _ in module[1].seen)
+    assert all(thread != threading.get_ident() for _, _, thread in module[1].seen)
+
+    for settings in [{"staged": True}, {"isolated": True}, {"trace_layers": True}, {"eval_mode": "meta"}]:
+        with pytest.raises(ValueError):
+            asyncio.run(DimChecker(**settings).test_dims_async(sum_last_dim, "bcl->bcn", n=1))
@@ -1,5 +1,5 @@
 import pytest
-from dim_checker.objects import VectorFormula, Formula
+from dim_checker.objects import VectorFormula, Formula, CompiledPattern, compile_pattern
 
 
 
@@ -34,3 +34,24 @@ def test_formula_vector_formulas(formula: str, nb_vf: int) -> None:
 
 
 
+@pytest.mark.parametrize("pattern, variables, in_shapes, out_shapes"
+, [
+    ("bcl->bcn", {"b": 5, "c": 7, "l": 11, "n": 1}, [[5, 7, 11]], [[5, 7, 1]]),
+    ("b(2*c+1)l, bl->b(c-1)", {"b": 5, "c": 7, "l": 11}, [[5, 15, 11], [5, 11]], [[5, 6]]),
+])
+def test_compiled_pattern(pattern: str, variables: dict, in_shapes: list, out_shapes: list) -> None:
+
+    cp = CompiledPattern(pattern)
+    assert [vf.evaluate(variables) for vf in cp.in_formulas] == in_shapes
+    assert [vf.evaluate(variables) for vf in cp.out_formulas] == out_shapes
+    assert set(cp.in_variables) == set().union(*(vf.variables for vf in cp.in_formulas))
+
+
+def test_compile_pattern_cache() -> None:
+
+    compile_pattern.cache_clear()
+    first = compile_pattern("bcl->b(2*c)l")
+    second = compile_pattern("bcl->b(2*c)l")
+    assert first is second
+    info = compile_pattern.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", [
+    "dim_checker",
+    "dim_checker.objects",
+    "dim_checker.contracts",
+    "dim_checker.dim_check",
+])
+def test_import_without_backends(module: str) -> None:
+
+    # the import time itself is measured by the benchmarks, see benchmarks/run_benchmarks.py
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        "print('torch' in sys.modules, 'numpy' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "False False"
+
+
+def test_numpy_check_without_torch() -> None:
+
+    code = (
+        "import sys\n"
+        "from dim_checker.dim_check import DimChecker\n"
+        "DimChecker(eval_type='numpy', eval_value='ones').test_dims(lambda x: x.sum(-1), 'bcl->bc')\n"
+        "print('torch' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "False"
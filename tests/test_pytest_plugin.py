@@ -0,0 +1,83 @@
+import importlib.metadata
+
+pytest_plugins = ["pytester"]
+
+
+def plugin_args() -> list[str]:
+    """Arguments loading the plugin: nothing once the package is installed, its pytest11 entry point
+    loads it, otherwise the plugin module is loaded explicitly."""
+    if any(entry.name == "dim_checker" for entry in importlib.metadata.entry_points(group="pytest11")):
+        return []
+    return ["-p", "dim_checker.pytest_plugin"]
+
+
+def test_plugin(pytester) -> None:
+
+    pytester.makepyfile("""
+        import pytest
+        import torch
+
+
+        def sum_last_dim(x):
+            return x.sum(-1, keepdim=True)
+
+
+        @pytest.mark.dims("bcl->bcn", n=1)
+        @pytest.mark.parametrize("c", [3, 4])
+        def test_marker(check_dims, c):
+            assert check_dims(sum_last_dim).trials
+
+
+        @pytest.mark.dims("bcl->bcl")
+        def test_marker_failure(check_dims):
+            check_dims(sum_last_dim)
+
+
+        def test_fixture(dim_checker):
+            dim_checker.test_dims(sum_last_dim, "bcl->bcn", "c <= 10", n=1)
+
+
+        def test_missing_marker(check_dims):
+            pass
+    """)
+    result = pytester.runpytest(*plugin_args(), "--dims-slowest", "2", "-o", "dims_depth=2")
+    result.assert_outcomes(passed=3, failed=1, errors=1)
+    result.stdout.fnmatch_lines([
+        "*slowest 2 dim checks*",
+        "*2 trial(s)*bcl->bcn*",
+        "*4 check(s) in *",
+    ])
+
+
+def test_xdist_groups(pytester) -> None:
+
+    pytester.makeconftest("""
+        def pytest_configure(config):
+            config.workerinput = {"workercount": 2}
+    """)
+    pytester.makepyfile("""
+        import pytest
+
+
+        @pytest.mark.dims("bchw->bchw")
+        def test_large():
+            pass
+
+
+        @pytest.mark.dims("bc->bc")
+        def test_small_1():
+            pass
+
+
+        @pytest.mark.dims("bc->bc")
+        def test_small_2():
+            pass
+
+
+        def test_group(request):
+            groups = {item.name: item.get_closest_marker("xdist_group").args[0]
+                      for item in request.session.items if item.get_closest_marker("dims")}
+            assert groups["test_small_1"] == groups["test_small_2"] != groups["test_large"]
+    """)
+    result = pytester.runpytest(*plugin_args())
+    result.assert_outcomes(passed=4)
@@ -0,0 +1,162 @@
+import functools
+import random
+import torch
+from dim_checker.dim_check import DimChecker
+from dim_checker.result_cache import ResultCache, fingerprint
+
+import pytest
+
+
+class CountingSum(torch.nn.Module):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def forward(self, x):
+        self.calls += 1
+        return x.sum(-1)
+
+
+def test_warm_run_skips_trials(tmp_path) -> None:
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    module = CountingSum()
+    checker = DimChecker(depth=3, result_cache=cache)
+
+    assert not checker.test_dims(module, "bcl->bc").cached
+    assert module.calls == 3
+    report = checker.test_dims(module, "bcl->bc")
+    assert report.cached and module.calls == 3
+
+    # other constraints or settings are other tests
+    checker.test_dims(module, "bcl->bc", b=2)
+    DimChecker(depth=2, result_cache=cache).test_dims(module, "bcl->bc")
+    assert module.calls == 8
+    assert len(cache) == 3
+
+
+def test_failures_are_not_cached(tmp_path) -> None:
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    checker = DimChecker(result_cache=cache)
+    for _ in range(2):
+        with pytest.raises(AssertionError):
+            checker.test_dims(CountingSum(), "bcl->bl")
+    assert len(cache) == 0
+
+
+def test_refresh_and_invalidate(tmp_path) -> None:
+
+    path = str(tmp_path / "cache.sqlite")
+    module = CountingSum()
+    DimChecker(result_cache=ResultCache(path)).test_dims(module, "bcl->bc")
+    DimChecker(result_cache=ResultCache(path, refresh=True)).test_dims(module, "bcl->bc")
+    assert module.calls == 2
+
+    cache = ResultCache(path)
+    cache.invalidate(module)
+    assert len(cache) == 0
+    DimChecker(result_cache=cache).test_dims(module, "bcl->bc")
+    assert module.calls == 3
+
+
+def test_eviction(tmp_path) -> None:
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    checker = DimChecker(result_cache=cache)
+    for n in range(4):
+        checker.test_dims(CountingSum(), "bcl->bc", b=n + 1)
+    assert len(cache) == 2
+
+
+def test_fingerprint() -> None:
+
+    assert fingerprint(torch.nn.Linear(3, 4)) == fingerprint(torch.nn.Linear(3, 4))
+    assert fingerprint(torch.nn.Linear(3, 4)) != fingerprint(torch.nn.Linear(3, 5))
+    assert fingerprint(lambda x: x.sum(-1)) != fingerprint(lambda x: x.sum(-2))
+
+
+def test_fingerprint_follows_code(tmp_path, monkeypatch) -> None:
+
+    import importlib
+    import sys
+
+    source = (
+        "import torch\n"
+        "def helper(x):\n"
+        "    return {body}\n"
+        "class Layer(torch.nn.Module):\n"
+        "    def forward(self, x):\n"
+        "        return helper(x)\n"
+        "def function(x):\n"
+        "    return helper(x)\n"
+    )
+    path = tmp_path / "fingerprinted.py"
+    path.write_text(source.format(body="x"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("fingerprinted")
+    before = [fingerprint(torch.nn.Sequential(module.Layer())), fingerprint(module.function)]
+
+    # a helper called by a function or by a submodule of a nn.Sequential changes
+    path.write_text(source.format(body="x.sum(-1, keepdim=True)"))
+    module = importlib.reload(module)
+    after = [fingerprint(torch.nn.Sequential(module.Layer())), fingerprint(module.function)]
+    del sys.modules["fingerprinted"]
+
+    assert before[0] != after[0] and before[1] != after[1]
+
+
+def test_settings_in_key(tmp_path) -> None:
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    module = CountingSum()
+    DimChecker(result_cache=cache).test_dims(module, "bcl->bc")
+    DimChecker(result_cache=cache, staged=True).test_dims(module, "bcl->bc")
+    DimChecker(result_cache=cache, compile_mode="fixed").test_dims(module, "bcl->bc")
+    DimChecker(result_cache=cache, module_eval=False).test_dims(module, "bcl->bc")
+    DimChecker(result_cache=cache, inference_mode=False).test_dims(module, "bcl->bc")
+    DimChecker(result_cache=cache, autocast=True).test_dims(module, "bcl->bc")
+    assert module.calls == 6
+
+
+class Keep:
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def __call__(self, x):
+        return x[..., :self.length]
+
+
+def keep(x, length):
+    return x[..., :length]
+
+
+def make_keep(length: int):
+    return lambda x: x[..., :length]
+
+
+def test_fingerprint_captured_values() -> None:
+
+    # arguments of partials, closure cells and attributes of callable objects are part of the fingerprint
+    assert fingerprint(functools.partial(keep, length=1)) == fingerprint(functools.partial(keep, length=1))
+    assert fingerprint(functools.partial(keep, length=1)) != fingerprint(functools.partial(keep, length=2))
+    assert fingerprint(make_keep(1)) == fingerprint(make_keep(1))
+    assert fingerprint(make_keep(1)) != fingerprint(make_keep(2))
+    assert fingerprint(Keep(1)) == fingerprint(Keep(1))
+    assert fingerprint(Keep(1)) != fingerprint(Keep(2))
+
+
+def test_unreliable_fingerprint_is_not_cached(tmp_path) -> None:
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    checker = DimChecker(result_cache=cache)
+    # the state of the generator is hidden
+    generator = random.Random(0)
+    function = functools.partial(lambda x, generator: x.sum(-1), generator=generator)
+
+    assert fingerprint(function) is None
+    for _ in range(2):
+        assert not checker.test_dims(function, "bcl->bc").cached
+    assert len(cache) == 0
@@ -0,0 +1,94 @@
+import random
+from dim_checker.dim_check import DimChecker
+from dim_checker.errors.constraint_errors import ConstraintRelationError
+from dim_checker.objects import Constraints, compile_pattern
+from dim_checker.sizes import SizeSelector
+
+import pytest
+
+
+@pytest.mark.parametrize("pattern, constraints, max_numel, max_total_numel", [
+    ("bchw->bchw", {}, 10**4, None),
+    ("b(2*c+1)l, bl->bl", {}, None, 2000),
+    ("bcl->bcn", {"n": 1, "b": 64}, 64 * 50, None),
+])
+def test_budget(pattern: str, constraints: dict, max_numel: int, max_total_numel: int) -> None:
+
+    pattern = compile_pattern(pattern)
+    selector = SizeSelector(max_numel=max_numel, max_total_numel=max_total_numel)
+    for seed in range(20):
+        variables = selector.select(pattern, constraints, random.Random(seed))
+        free = [variables[var] for var in pattern.in_variables if var not in constraints]
+        assert len(set(free)) == len(free)
+        assert selector.within_budget(pattern, variables)
+
+
+def test_budget_too_small() -> None:
+
+    with pytest.raises(ValueError):
+        SizeSelector(max_numel=100).select(compile_pattern("bchw->bchw"), {}, random.Random(0))
+
+
+def test_checker_budget() -> None:
+
+    report = DimChecker(depth=5, max_bytes=4 * 10**4).test_dims(lambda x: x.sum(-1), "bchw->bch")
+    for trial in report.trials:
+        assert trial.variables["b"] * trial.variables["c"] * trial.variables["h"] * trial.variables["w"] <= 10**4
+
+
+@pytest.mark.parametrize("pattern, constraints", [
+    ("b(2*c+1)l->b(c-1)l", {}),
+    ("bcl->b(c*l)(c+l)", {}),
+    ("bcl->bcn", {"n": 1}),
+])
+def test_collision_free(pattern: str, constraints: dict) -> None:
+
+    pattern = compile_pattern(pattern)
+    selector = SizeSelector(max_size=20)
+    for seed in range(20):
+        variables = selector.select(pattern, constraints, random.Random(seed))
+        assert not selector.collisions(pattern, variables)
+        values = [dim.evaluate(variables) for dim in pattern.dims if dim.variables <= variables.keys()]
+        assert len(set(values)) == len(values)
+
+
+def test_unavoidable_collisions() -> None:
+
+    report = DimChecker().test_dims(lambda x: x, "bcl->bcl", c=3, l=3)
+    assert report.trials[0].collisions == [("c", "l")]
+    assert not report.collision_free
+    assert DimChecker(depth=3).test_dims(lambda x: x, "b(2*c+1)l->b(2*c+1)l").collision_free
+
+
+def test_relations() -> None:
+
+    pattern = compile_pattern("bch,bnh->b(c+n)h")
+    constraints = Constraints({"b": 2}, ["h % 8 == 0", "4 <= c <= 20", "n == 2*c", "h > c"])
+    selector = SizeSelector()
+    assert constraints.tables(["c", "h"], selector.primes, selector.max_size)["h"] == list(range(8, 100, 8))
+    for seed in range(20):
+        variables = selector.select(pattern, constraints, random.Random(seed))
+        assert variables["h"] % 8 == 0 and 4 <= variables["c"] <= 20 and variables["h"] > variables["c"]
+        assert variables["n"] == 2 * variables["c"] and variables["b"] == 2
+    assert selector.smallest(pattern, constraints) == {"b": 2, "c": 5, "h": 8, "n": 10}
+
+
+def test_invalid_relations() -> None:
+
+    with pytest.raises(ConstraintRelationError):
+        Constraints({}, ["h + 1"])
+    with pytest.raises(ValueError):
+        SizeSelector().select(compile_pattern("bh->bh"), Constraints({}, ["h < 0"]), random.Random(0))
+
+
+def test_smallest_many_variables() -> None:
+
+    selector = SizeSelector()
+    variables = selector.smallest(compile_pattern("abcdefgh->abcdefgh"), {})
+    assert sorted(variables.values()) == [5, 7, 11, 13, 17, 19, 23, 29]
+    DimChecker(staged=True, eval_mode="meta").test_dims(lambda x: x, "abcdefgh->abcdefgh")
+
+    # staged trials need as many primes as the random ones
+    for staged in [False, True]:
+        with pytest.raises(ValueError):
+            DimChecker(max_size=12, staged=staged).test_dims(lambda x: x, "abcd->abcd")
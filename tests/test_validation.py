@@ -0,0 +1,49 @@
+import numpy as np
+from dim_checker.objects import Pattern
+from dim_checker.validation import validate_shapes
+
+import pytest
+
+
+def test_validate_shapes() -> None:
+
+    in_shapes = [np.array([[2, 3, 5], [2, 3, 5], [4, 7, 11], [4, 7, 11]])]
+    out_shapes = [np.array([[2, 7], [3, 7], [4, 15], [4, 15]])]
+    # last record: the output should be "b(2*c+1)" = (4, 15) for this input, it is valid.
+    report = validate_shapes(Pattern("bcl->b(2*c+1)"), in_shapes, out_shapes)
+    assert report.mask.tolist() == [True, False, True, True]
+    assert report.violations == {"b": 1, "c": 0, "l": 0, "(2*c+1)": 0}
+    assert not report.passed and report.nb_invalid == 1
+
+
+def test_validate_shapes_solving() -> None:
+
+    # n is bound by solving (2*n+1) on the input
+    in_shapes = [np.array([[7, 3], [8, 3], [9, 0]])]
+    out_shapes = [np.array([[3], [3], [4]])]
+    report = validate_shapes("(2*n+1)c->n", in_shapes, out_shapes)
+    assert report.mask.tolist() == [True, False, True]
+    assert report.violations["(2*n+1)"] == 1
+
+    report = validate_shapes("bc->bn", [np.array([[2, 3]])], [np.array([[2, 4]])], n=5)
+    assert report.violations == {"b": 0, "c": 0, "n": 1}
+
+
+def test_validate_shapes_invalid_arrays() -> None:
+
+    with pytest.raises(ValueError):
+        validate_shapes("bc->b", [np.zeros((4, 3))], [np.zeros((4, 1))])
+    with pytest.raises(ValueError):
+        validate_shapes("bc->b", [np.zeros((4, 2))], [])
+
+
+def test_validate_many_records() -> None:
+
+    # the speed of the validation is measured by the benchmarks, see benchmarks/run_benchmarks.py
+    n = 10**5
+    b, c = np.random.randint(1, 100, (2, n))
+    out = np.stack([b, 2 * c + 1], 1)
+    out[::7, 1] += 1
+    report = validate_shapes("bc,c->b(2*c+1)", [np.stack([b, c], 1), c[:, None]], [out])
+    assert report.nb_invalid == len(range(0, n, 7))
+    assert report.violations == {"b": 0, "c": 0, "(2*c+1)": len(range(0, n, 7))}
@@ -0,0 +1,101 @@
+import torch
+import numpy as np
+from dim_checker.dim_check import DimChecker
+from dim_checker.objects import Vector, InputPool, Backend, register_backend
+from dim_checker.objects.backends import BACKENDS
+
+import pytest
+
+
+@pytest.mark.parametrize("eval_type, eval_value, expected", [
+    ("torch", "ones", 1.),
+    ("torch", "zeros", 0.),
+    ("torch", 3, 3.),
+    ("numpy", "ones", 1.),
+    ("numpy", 2.5, 2.5),
+])
+def test_constant_vector(eval_type: str, eval_value, expected: float) -> None:
+
+    vector = Vector([5, 7, 11], eval_value, eval_type, torch.device("cpu")).eval_vector
+    assert tuple(vector.shape) == (5, 7, 11)
+    assert (vector == expected).all()
+    # constant vectors can be modified in place
+    vector += 1
+    assert (vector == expected + 1).all()
+
+
+@pytest.mark.parametrize("eval_value", ["ones", "zeros"])
+def test_constant_vector_inplace(eval_value: str) -> None:
+
+    DimChecker(eval_value=eval_value).test_dims(torch.nn.ReLU(inplace=True), "bcl->bcl")
+
+
+def test_input_pool() -> None:
+
+    pool = InputPool(max_bytes=4 * 2 * 5 * 7)
+    first = Vector([5, 7], "random", "torch", torch.device("cpu"), pool).eval_vector
+    second = Vector([5, 7], "random", "torch", torch.device("cpu"), pool).eval_vector
+    assert first is second
+    assert (pool.hits, pool.misses) == (1, 1)
+
+    # the least recently used vector is evicted
+    Vector([7, 5], "random", "torch", torch.device("cpu"), pool).eval_vector
+    Vector([5, 11], "random", "torch", torch.device("cpu"), pool).eval_vector
+    assert pool.nbytes <= pool.max_bytes
+    assert Vector([5, 7], "random", "torch", torch.device("cpu"), pool).eval_vector is not first
+
+    DimChecker(depth=3, input_pool=pool).test_dims(lambda x: x.sum(-1), "bcl->bc")
+
+
+@pytest.mark.parametrize("eval_type, dtype, expected", [
+    ("torch", "float16", torch.float16),
+    ("torch", "bfloat16", torch.bfloat16),
+    ("torch", "int8", torch.int8),
+    ("torch", "int16", torch.int16),
+    ("torch", "uint8", torch.uint8),
+    ("torch", "bool", torch.bool),
+    ("numpy", "float32", np.float32),
+    ("numpy", "int8", np.int8),
+    ("numpy", "uint16", np.uint16),
+    ("numpy", "bool", np.bool_),
+])
+def test_dtype(eval_type: str, dtype: str, expected) -> None:
+
+    for eval_value in ["random", "ones"]:
+        vector = Vector([5, 7, 11], eval_value, eval_type, None, dtype=dtype).eval_vector
+        assert tuple(vector.shape) == (5, 7, 11)
+        assert vector.dtype == expected
+
+    DimChecker(eval_type=eval_type, dtype=dtype).test_dims(lambda x: x[..., :1], "bcl->bcn", n=1)
+
+
+def test_unknown_backend() -> None:
+
+    with pytest.raises(ValueError):
+        Vector([5, 7], "random", "cupy", None).eval_vector
+    with pytest.raises(ValueError):
+        Vector([5, 7], "random", "numpy", None, dtype="bfloat16").eval_vector
+
+
+@pytest.mark.parametrize("eval_type", ["torch", "numpy"])
+def test_unknown_dtype(eval_type: str) -> None:
+
+    with pytest.raises(ValueError, match="float13"):
+        DimChecker(eval_type=eval_type, dtype="float13")
+
+
+def test_register_backend() -> None:
+
+    class ListBackend(Backend):
+
+        def random(self, shape, dtype, device):
+            return self.full(shape, 0., dtype, device)
+
+        def full(self, shape, value, dtype, device):
+            return np.full(shape, value)
+
+    register_backend("list", ListBackend())
+    try:
+        DimChecker(eval_type="list").test_dims(lambda x: x.sum(-1), "bcl->bc")
+    finally:
+        BACKENDS.pop("list")